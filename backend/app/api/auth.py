@@ -5,22 +5,40 @@ MVP implementation uses HTTP Basic Auth.
 Includes Box OAuth2 integration for cloud file access.
 """
 
+import asyncio
+import hashlib
+import hmac
 import os
 from typing import Optional
 import secrets
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 
+from app.cache import clear_box_listing_cache
 from app.config import settings
-from app.services.box_service import get_box_service, reinitialize_box_service
+from app.services.box_service import BoxService, get_app_box_service, get_box_service, reinitialize_box_service
 
 
 router = APIRouter()
 security = HTTPBasic()
 
+# Credentials are compared as fixed-length HMAC digests so the comparison
+# doesn't depend on the length of the supplied values
+_CREDENTIAL_KEY = settings.secret_key.encode("utf8")
+
+
+def _credential_digest(value: str) -> bytes:
+    """Return the keyed SHA-256 digest of a credential."""
+    return hmac.new(_CREDENTIAL_KEY, value.encode("utf8"), hashlib.sha256).digest()
+
+
+# Configured credentials hashed once; settings don't change at runtime
+_USERNAME_DIGEST = _credential_digest(settings.basic_auth_username)
+_PASSWORD_DIGEST = _credential_digest(settings.basic_auth_password)
+
 
 # ----- Pydantic Schemas -----
 
@@ -43,7 +61,7 @@ class LoginResponse(BaseModel):
 # ----- Authentication Functions -----
 
 
-def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) -> str:
+async def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) -> str:
     """
     Verify HTTP Basic Auth credentials.
 
@@ -52,12 +70,12 @@ def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) ->
     """
     # Use secrets.compare_digest to prevent timing attacks
     correct_username = secrets.compare_digest(
-        credentials.username.encode("utf8"),
-        settings.basic_auth_username.encode("utf8"),
+        _credential_digest(credentials.username),
+        _USERNAME_DIGEST,
     )
     correct_password = secrets.compare_digest(
-        credentials.password.encode("utf8"),
-        settings.basic_auth_password.encode("utf8"),
+        _credential_digest(credentials.password),
+        _PASSWORD_DIGEST,
     )
 
     if not (correct_username and correct_password):
@@ -70,7 +88,7 @@ def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) ->
     return credentials.username
 
 
-def get_current_user(username: str = Depends(verify_credentials)) -> dict:
+async def get_current_user(username: str = Depends(verify_credentials)) -> dict:
     """
     Get the current authenticated user.
 
@@ -86,7 +104,7 @@ def get_current_user(username: str = Depends(verify_credentials)) -> dict:
 # ----- Optional Authentication -----
 
 
-def optional_auth(credentials: Optional[HTTPBasicCredentials] = Depends(security)) -> Optional[str]:
+async def optional_auth(credentials: Optional[HTTPBasicCredentials] = Depends(security)) -> Optional[str]:
     """
     Optional authentication - returns username if provided, None otherwise.
 
@@ -96,7 +114,7 @@ def optional_auth(credentials: Optional[HTTPBasicCredentials] = Depends(security
         return None
 
     try:
-        return verify_credentials(credentials)
+        return await verify_credentials(credentials)
     except HTTPException:
         return None
 
@@ -158,7 +176,7 @@ async def check_auth(username: str = Depends(verify_credentials)):
 # ----- Dependency for Protected Routes -----
 
 
-def require_auth(user: dict = Depends(get_current_user)) -> dict:
+async def require_auth(user: dict = Depends(get_current_user)) -> dict:
     """
     Dependency to require authentication on a route.
 
@@ -234,7 +252,7 @@ async def box_oauth_login():
 
 
 @router.get("/box/callback")
-async def box_oauth_callback(code: str = Query(...), state: str = Query(None)):
+async def box_oauth_callback(request: Request, code: str = Query(...), state: str = Query(None)):
     """
     Handle Box OAuth2 callback.
 
@@ -248,11 +266,12 @@ async def box_oauth_callback(code: str = Query(...), state: str = Query(None)):
         )
 
     box_service = get_box_service()
-    success = box_service.authenticate_with_code(code, redirect_uri)
+    # The code exchange is a blocking call to Box, so keep it off the event loop
+    success = await asyncio.to_thread(box_service.authenticate_with_code, code, redirect_uri)
 
     if success:
-        # Reinitialize the service with new tokens
-        reinitialize_box_service()
+        # Reinitialize the service with new tokens and share the new instance
+        request.app.state.box_service = reinitialize_box_service()
 
         # Redirect to frontend or return success
         frontend_url = os.environ.get('FRONTEND_URL', 'https://rmp-pipeline-frontend.onrender.com')
@@ -275,7 +294,7 @@ async def box_connection_status():
 
     if box_service.is_connected():
         try:
-            user = box_service.client.user().get()
+            user = await asyncio.to_thread(box_service.client.user().get)
             return {
                 "connected": True,
                 "user": {
@@ -295,3 +314,19 @@ async def box_connection_status():
             "connected": False,
             "message": "Visit /api/auth/box/login to authorize"
         }
+
+
+@router.post("/box/cache/clear")
+async def clear_box_cache(
+    user: dict = Depends(require_auth),
+    box_service: BoxService = Depends(get_app_box_service),
+):
+    """
+    Clear cached Box folder listings.
+
+    Requires authentication. Use after reorganizing folders in Box to see
+    the changes before the caches expire.
+    """
+    box_service.clear_cache()
+    clear_box_listing_cache()
+    return {"status": "cleared"}
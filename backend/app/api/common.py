@@ -0,0 +1,68 @@
+"""
+Helpers shared by the properties and pipeline routers.
+
+Kept outside the router modules so neither router has to import the other.
+"""
+
+from typing import Tuple
+from datetime import datetime
+import base64
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload, raiseload
+
+from app.models.property import Property
+
+# Matches the position before each capital letter (except at the start)
+_CAMEL_CASE_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+# A single property with its status and broker info joined in, built once
+PROPERTY_DETAIL_QUERY = select(Property).options(
+    joinedload(Property.pipeline_status),
+    joinedload(Property.broker_info),
+    raiseload("*"),
+)
+
+
+def clean_property_name(folder_name: str) -> str:
+    """
+    Convert folder name to readable property name.
+
+    Examples:
+        VarsityTownhomes -> Varsity Townhomes
+        NorthOakCrossing -> North Oak Crossing
+    """
+    # Insert space before capital letters, then replace underscores with spaces
+    return _CAMEL_CASE_RE.sub(' ', folder_name).replace('_', ' ').strip()
+
+
+def encode_cursor(prop) -> str:
+    """
+    Encode a property's (created_at, id) sort key as a pagination cursor.
+
+    Accepts a Property or any row with created_at and id attributes.
+    """
+    key = f"{prop.created_at.isoformat()}|{prop.id}"
+    return base64.urlsafe_b64encode(key.encode("utf8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a pagination cursor back into its (created_at, id) sort key."""
+    try:
+        created_at, last_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf8").split("|")
+        return datetime.fromisoformat(created_at), int(last_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(cursor: str):
+    """
+    Keyset filter for rows after a cursor, in (created_at, id) DESC order.
+
+    Seeks along the (created_at, id) indexes instead of scanning and
+    discarding OFFSET rows, so deep pages cost the same as the first.
+    """
+    created_at, last_id = _decode_cursor(cursor)
+    return tuple_(Property.created_at, Property.id) < tuple_(created_at, last_id)
@@ -8,20 +8,48 @@ NEW: Reads properties from Box folder structure as source of truth.
 Box Path: 3. Underwriting Pipeline/Screener/Properties/Zone*/[PropertyName]/
 """
 
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from enum import Enum
+import asyncio
+import hashlib
 import logging
 import re
+import time
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+import orjson
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select, func
+from sqlalchemy import func, literal, null, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.api.common import (
+    PROPERTY_DETAIL_QUERY,
+    after_cursor,
+    clean_property_name,
+    encode_cursor,
+)
+from app.cache import (
+    STATS_REDIS_VERSION_KEY,
+    RedisError,
+    box_listing_cache,
+    clear_property_cache,
+    get_redis,
+    invalidate_pipeline_stats,
+    pipeline_stats_version,
+)
+from app.database import async_session_maker, get_db
 from app.models.property import Property, PipelineStatus, BrokerInfo
-from app.services.box_service import get_box_service
+from app.responses import ORJSONResponse
+from app.services.box_service import (
+    BoxAPIException,
+    BoxService,
+    get_app_box_service,
+    list_folders_concurrently,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +59,44 @@ router = APIRouter()
 BOX_PROPERTIES_PATH = "3. Underwriting Pipeline/Screener/Properties"
 
 
+class PipelinePhase(str, Enum):
+    """Pipeline phases in deal order."""
+
+    INITIAL_REVIEW = "Initial Review"
+    SCREENER = "Screener"
+    LOI = "LOI"
+    UNDER_CONTRACT = "Under Contract"
+    CLOSED = "Closed"
+    PASSED = "Passed"
+
+
+# Names of screener output: starting with "screener" or containing "output"
+_SCREENER_OUTPUT_RE = re.compile(r'^screener|output', re.IGNORECASE)
+
+# How long a Box folder listing is reused before hitting the Box API again
+BOX_LISTING_TTL_SECONDS = 60
+
+_box_listing_lock = asyncio.Lock()
+
+# How long pipeline stats are reused before querying the database again
+STATS_TTL_SECONDS = 15
+
+# How long stats stay in Redis; stale versions are never read and simply expire
+STATS_REDIS_TTL_SECONDS = 30
+
+# Cached serialized stats {"body", "expires", "version"}, checked against
+# pipeline_stats_version() so writes invalidate it before its TTL runs out
+_stats_cache: Dict[str, Any] = {}
+_stats_lock = asyncio.Lock()
+
+# Rows fetched per round-trip when streaming the database export
+EXPORT_BATCH_SIZE = 100
+
+# Pages at least this big are serialized off the event loop; below it the
+# thread hand-off costs more than the encoding
+SERIALIZE_IN_THREAD_MIN_ROWS = 200
+
+
 # ----- Pydantic Schemas -----
 
 
@@ -67,7 +133,7 @@ class BrokerInfoUpdate(BaseModel):
 class PipelineItemResponse(BaseModel):
     """Schema for a single pipeline item (property with status)."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
     # Property fields
     id: int
@@ -96,6 +162,38 @@ class PipelineItemResponse(BaseModel):
     broker_name: Optional[str] = None
 
 
+# Related-model fields flattened into PipelineItemResponse
+_PIPELINE_STATUS_FIELDS = (
+    "phase",
+    "priority",
+    "on_off_market",
+    "date_added",
+    "offer_due",
+    "asking_price",
+    "unit_count",
+    "vintage",
+    "price_per_unit",
+    "pass_reason",
+    "screener_link",
+    "notes",
+)
+_BROKER_INFO_FIELDS = ("source", "broker_name")
+
+# Just the columns a pipeline item needs, in PipelineItemResponse order, so
+# listings select flat rows instead of whole Property/status/broker objects
+_PIPELINE_ITEM_COLUMNS = (
+    Property.id,
+    Property.name,
+    Property.address,
+    Property.city,
+    Property.state,
+    Property.zone,
+    *(getattr(PipelineStatus, field) for field in _PIPELINE_STATUS_FIELDS),
+    *(getattr(BrokerInfo, field) for field in _BROKER_INFO_FIELDS),
+)
+_PIPELINE_ITEM_KEYS = tuple(column.key for column in _PIPELINE_ITEM_COLUMNS)
+
+
 class PipelineStatsResponse(BaseModel):
     """Schema for pipeline statistics."""
 
@@ -128,19 +226,76 @@ class BoxPipelineResponse(BaseModel):
 # ----- Helper Functions -----
 
 
-def clean_property_name(folder_name: str) -> str:
+def _pipeline_item_dict(prop: Property) -> Dict[str, Any]:
+    """
+    Flatten a property with its pipeline status and broker info into a dict
+    with every PipelineItemResponse field, ready for orjson.
     """
-    Convert folder name to readable property name.
+    status = prop.pipeline_status
+    broker = prop.broker_info
+
+    data = {
+        "id": prop.id,
+        "name": prop.name,
+        "address": prop.address,
+        "city": prop.city,
+        "state": prop.state,
+        "zone": prop.zone,
+    }
+    for field in _PIPELINE_STATUS_FIELDS:
+        data[field] = getattr(status, field) if status is not None else None
+    for field in _BROKER_INFO_FIELDS:
+        data[field] = getattr(broker, field) if broker is not None else None
+
+    return data
+
+
+def _upsert_for_property(db: AsyncSession, model, property_id: int, values: Dict[str, Any]):
+    """
+    Build an upsert for a one-to-one row keyed by property_id.
 
-    Examples:
-        VarsityTownhomes -> Varsity Townhomes
-        NorthOakCrossing -> North Oak Crossing
+    Renders INSERT ... SELECT FROM properties ... ON CONFLICT (property_id)
+    DO UPDATE, so a missing property inserts nothing and RETURNING comes
+    back empty instead of leaving an orphan row.
     """
-    # Insert space before capital letters
-    spaced = re.sub(r'(?<!^)(?=[A-Z])', ' ', folder_name)
-    # Replace underscores with spaces
-    spaced = spaced.replace('_', ' ')
-    return spaced.strip()
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    columns = model.__table__.c
+
+    source = select(
+        Property.id,
+        *(literal(value, type_=columns[field].type) for field, value in values.items()),
+    ).where(Property.id == property_id)
+
+    stmt = dialect.insert(model).from_select(["property_id", *values], source)
+    # DO UPDATE needs at least one column; a no-op set still returns the row
+    set_ = values or {"property_id": stmt.excluded.property_id}
+
+    return stmt.on_conflict_do_update(
+        index_elements=[model.property_id], set_=set_
+    ).returning(model.id)
+
+
+def _get_cached_stats() -> Optional[bytes]:
+    """Return cached serialized stats if they are fresh and not invalidated."""
+    if (
+        _stats_cache
+        and _stats_cache["version"] == pipeline_stats_version()
+        and _stats_cache["expires"] > time.monotonic()
+    ):
+        return _stats_cache["body"]
+    return None
+
+
+def _stats_response(request: Request, body: bytes) -> Response:
+    """
+    Respond with serialized stats and an ETag hashed from them.
+
+    Returns 304 when the client's If-None-Match already has these stats.
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 def extract_zone_name(zone_folder_name: str) -> str:
@@ -153,14 +308,16 @@ def extract_zone_name(zone_folder_name: str) -> str:
     return zone_folder_name
 
 
-async def list_properties_from_box() -> BoxPipelineResponse:
+async def _list_properties_from_box_uncached(
+    box_service: BoxService,
+    zone: Optional[str] = None,
+) -> BoxPipelineResponse:
     """
     Read properties from Box folder structure.
 
     Navigates: Properties/ -> Zone*/ -> [PropertyName]/
+    If a zone is given, only that zone's folder is read.
     """
-    box_service = get_box_service()
-
     if not box_service.is_connected():
         logger.warning("Box not connected - returning empty list")
         return BoxPipelineResponse(
@@ -172,7 +329,9 @@ async def list_properties_from_box() -> BoxPipelineResponse:
 
     try:
         # Find the Properties folder
-        properties_folder_id = box_service.find_folder(BOX_PROPERTIES_PATH)
+        properties_folder_id = await asyncio.to_thread(
+            box_service.find_folder, BOX_PROPERTIES_PATH
+        )
 
         if not properties_folder_id:
             logger.warning(f"Properties folder not found at: {BOX_PROPERTIES_PATH}")
@@ -185,45 +344,74 @@ async def list_properties_from_box() -> BoxPipelineResponse:
 
         logger.info(f"Found Properties folder: {properties_folder_id}")
 
-        # List zone folders
-        zone_folders = box_service.list_folder(properties_folder_id)
-        logger.info(f"Found {len(zone_folders)} zone folders")
+        if zone:
+            # Resolve just the requested zone folder
+            zone_id = await asyncio.to_thread(
+                box_service.find_folder, zone, properties_folder_id
+            )
+            zone_folders = [{'id': zone_id, 'name': zone}] if zone_id else []
+            search_folder_id = zone_id
+        else:
+            # List zone folders
+            zone_folders = await asyncio.to_thread(box_service.list_folder, properties_folder_id)
+            zone_folders = [z for z in zone_folders if z['type'] == 'folder']
+            logger.info(f"Found {len(zone_folders)} zone folders")
+            search_folder_id = properties_folder_id
+
+        # List property folders in every zone concurrently
+        zone_listings = await list_folders_concurrently(
+            box_service, [zone_folder['id'] for zone_folder in zone_folders]
+        )
+        prop_folders = [
+            (zone_folder['name'], prop_folder)
+            for zone_folder, property_folders in zip(zone_folders, zone_listings)
+            for prop_folder in property_folders
+            if prop_folder['type'] == 'folder'
+        ]
+
+        # One search finds screener output for most properties at once; names
+        # are re-checked locally since Box search matches on tokens rather
+        # than substrings
+        screener_parents = set()
+        if prop_folders:
+            try:
+                matches = await asyncio.to_thread(
+                    box_service.search, "screener OR output", search_folder_id
+                )
+            except BoxAPIException as e:
+                logger.warning(f"Box search failed, checking property folders directly: {e}")
+                matches = []
+            screener_parents = {
+                item['parent_id']
+                for item in matches
+                if _SCREENER_OUTPUT_RE.search(item['name'])
+            }
+
+        # Search misses names like "PropertyOutput.xlsx" and lags new uploads,
+        # so the folder listing stays the source of truth for the rest
+        unmatched = [
+            prop_folder['id']
+            for _, prop_folder in prop_folders
+            if prop_folder['id'] not in screener_parents
+        ]
+        unmatched_listings = await list_folders_concurrently(box_service, unmatched)
+        screener_parents.update(
+            folder_id
+            for folder_id, contents in zip(unmatched, unmatched_listings)
+            if any(_SCREENER_OUTPUT_RE.search(item['name']) for item in contents)
+        )
 
         properties = []
 
-        for zone_folder in zone_folders:
-            if zone_folder['type'] != 'folder':
-                continue
-
-            zone_name = zone_folder['name']
-            zone_id = zone_folder['id']
-
-            # List property folders within this zone
-            property_folders = box_service.list_folder(zone_id)
-
-            for prop_folder in property_folders:
-                if prop_folder['type'] != 'folder':
-                    continue
-
-                prop_name = clean_property_name(prop_folder['name'])
-                prop_id = prop_folder['id']
-
-                # Check if screener output exists (look for Screener Output folder or file)
-                prop_contents = box_service.list_folder(prop_id)
-                has_screener = any(
-                    item['name'].lower().startswith('screener') or
-                    'output' in item['name'].lower()
-                    for item in prop_contents
-                )
-
-                properties.append(BoxPipelineItem(
-                    id=prop_id,
-                    name=prop_name,
-                    zone=zone_name,
-                    phase=None,  # Phase not tracked in Box
-                    has_screener_output=has_screener,
-                    folder_path=f"{BOX_PROPERTIES_PATH}/{zone_name}/{prop_folder['name']}"
-                ))
+        for zone_name, prop_folder in prop_folders:
+            properties.append(BoxPipelineItem(
+                id=prop_folder['id'],
+                name=clean_property_name(prop_folder['name']),
+                zone=zone_name,
+                phase=None,  # Phase not tracked in Box
+                has_screener_output=prop_folder['id'] in screener_parents,
+                folder_path=f"{BOX_PROPERTIES_PATH}/{zone_name}/{prop_folder['name']}"
+            ))
 
         logger.info(f"Found {len(properties)} properties in Box")
 
@@ -244,12 +432,103 @@ async def list_properties_from_box() -> BoxPipelineResponse:
         )
 
 
+def _listing_cache_key(zone: Optional[str]) -> str:
+    """Cache key for a listing: the Box path that was read."""
+    return f"{BOX_PROPERTIES_PATH}/{zone}" if zone else BOX_PROPERTIES_PATH
+
+
+def _fresh_cache_entry(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cache entry for a key if it hasn't expired."""
+    entry = box_listing_cache.get(key)
+    if entry and entry["expires"] > time.monotonic():
+        return entry
+    return None
+
+
+def _get_cached_listing(zone: Optional[str]) -> Optional[BoxPipelineResponse]:
+    """
+    Return a cached listing for the zone (or all zones), if one is fresh.
+
+    A fresh full listing also answers zone requests. Returns a copy so
+    callers can't modify the cached value.
+    """
+    entry = _fresh_cache_entry(BOX_PROPERTIES_PATH)
+    if entry:
+        listing = entry["value"]
+        if not zone:
+            return listing.model_copy()
+        properties = [p for p in listing.properties if p.zone == zone]
+        return listing.model_copy(
+            update={"properties": properties, "total_count": len(properties)}
+        )
+
+    if zone:
+        entry = _fresh_cache_entry(_listing_cache_key(zone))
+        if entry:
+            return entry["value"].model_copy()
+
+    return None
+
+
+async def list_properties_from_box(
+    box_service: BoxService,
+    zone: Optional[str] = None,
+) -> BoxPipelineResponse:
+    """
+    Read properties from Box, reusing a recent listing if one is cached.
+
+    Only successful listings are cached.
+    """
+    cached = _get_cached_listing(zone)
+    if cached is not None:
+        return cached
+
+    async with _box_listing_lock:
+        # Another request may have refreshed the cache while we waited
+        cached = _get_cached_listing(zone)
+        if cached is not None:
+            return cached
+
+        key = _listing_cache_key(zone)
+        result = await _list_properties_from_box_uncached(box_service, zone)
+        if result.box_connected and result.warning is None:
+            box_listing_cache[key] = {
+                "value": result,
+                "body": orjson.dumps(result.model_dump()),
+                "expires": time.monotonic() + BOX_LISTING_TTL_SECONDS,
+                "fetched_at": datetime.now(timezone.utc),
+            }
+        else:
+            box_listing_cache.pop(key, None)
+        return result.model_copy()
+
+
+def get_box_listing_fetched_at(zone: Optional[str] = None) -> Optional[datetime]:
+    """Return when the cached listing for a zone was fetched, if one is cached."""
+    entry = _fresh_cache_entry(BOX_PROPERTIES_PATH)
+    if entry is None and zone:
+        entry = _fresh_cache_entry(_listing_cache_key(zone))
+    return entry["fetched_at"] if entry else None
+
+
+def _listing_etag(fetched_at: datetime, zone: Optional[str]) -> str:
+    """Weak ETag for a Box listing, derived from when it was fetched."""
+    return f'W/"{int(fetched_at.timestamp() * 1000)}-{zone or "all"}"'
+
+
 # ----- API Endpoints -----
 
 
-@router.get("/", response_model=BoxPipelineResponse)
+@router.api_route(
+    "/",
+    methods=["GET", "HEAD"],
+    response_model=BoxPipelineResponse,
+    response_class=ORJSONResponse,
+)
 async def get_pipeline(
+    request: Request,
     zone: Optional[str] = None,
+    box_service: BoxService = Depends(get_app_box_service),
 ):
     """
     Get pipeline view with all properties from Box folder structure.
@@ -264,20 +543,76 @@ async def get_pipeline(
     Returns:
         BoxPipelineResponse with list of properties and connection status
     """
-    result = await list_properties_from_box()
+    entry = _fresh_cache_entry(_listing_cache_key(zone))
+    if entry is not None:
+        # Cached listings are stored already serialized
+        body = entry["body"]
+        fetched_at = entry["fetched_at"]
+    else:
+        result = await list_properties_from_box(box_service, zone)
+        body = None
+        fetched_at = get_box_listing_fetched_at(zone)
+
+    # Let browsers revalidate against the cached listing
+    headers = {}
+    if fetched_at is not None:
+        etag = _listing_etag(fetched_at, zone)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        headers = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(fetched_at, usegmt=True),
+        }
+
+    if body is None:
+        # Already a validated model, so skip re-validating it as the response
+        body = orjson.dumps(result.model_dump())
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _serialize_pipeline_rows(rows) -> bytes:
+    """Encode pipeline item rows from _pipeline_db_query as a JSON array."""
+    return orjson.dumps([dict(zip(_PIPELINE_ITEM_KEYS, row)) for row in rows])
+
+
+def _pipeline_db_query(
+    phase: Optional[str] = None,
+    zone: Optional[str] = None,
+    priority: Optional[str] = None,
+):
+    """
+    Build the filtered pipeline query, newest first, for the /db endpoints.
 
-    # Apply zone filter if provided
-    if zone and result.properties:
-        result.properties = [p for p in result.properties if p.zone == zone]
-        result.total_count = len(result.properties)
+    Rows hold the _PIPELINE_ITEM_COLUMNS followed by created_at for the
+    pagination cursor. Status and broker are LEFT OUTER JOINed, so
+    properties without them still come back, with those fields as None.
+    """
+    query = (
+        select(*_PIPELINE_ITEM_COLUMNS, Property.created_at)
+        .select_from(Property)
+        .outerjoin(PipelineStatus, PipelineStatus.property_id == Property.id)
+        .outerjoin(BrokerInfo, BrokerInfo.property_id == Property.id)
+    )
 
-    return result
+    # property_id is unique on pipeline_status, so filtering the joined row
+    # keeps one row per property and can use the (phase, priority) index
+    if phase:
+        query = query.where(PipelineStatus.phase == phase)
+    if priority:
+        query = query.where(PipelineStatus.priority == priority)
 
+    if zone:
+        query = query.where(Property.zone == zone)
 
-@router.get("/db", response_model=List[PipelineItemResponse])
+    return query.order_by(Property.created_at.desc(), Property.id.desc())
+
+
+@router.get("/db", response_model=List[PipelineItemResponse], response_class=ORJSONResponse)
 async def get_pipeline_from_db(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     phase: Optional[str] = None,
     zone: Optional[str] = None,
     priority: Optional[str] = None,
@@ -291,65 +626,69 @@ async def get_pipeline_from_db(
 
     - **skip**: Number of records to skip (pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Resume after the last item of a previous page (takes precedence over skip)
     - **phase**: Filter by pipeline phase
     - **zone**: Filter by geographic zone
     - **priority**: Filter by priority level
+
+    When a full page is returned, the X-Next-Cursor header holds the cursor
+    for the next page.
     """
-    query = (
-        select(Property)
-        .options(
-            selectinload(Property.pipeline_status),
-            selectinload(Property.broker_info),
-        )
-    )
+    query = _pipeline_db_query(phase=phase, zone=zone, priority=priority)
 
-    # Apply filters via joins
-    if phase or priority:
-        query = query.join(Property.pipeline_status)
-        if phase:
-            query = query.where(PipelineStatus.phase == phase)
-        if priority:
-            query = query.where(PipelineStatus.priority == priority)
+    if cursor:
+        query = query.where(after_cursor(cursor))
+    else:
+        query = query.offset(skip)
 
-    if zone:
-        query = query.where(Property.zone == zone)
+    result = await db.execute(query.limit(limit))
 
-    query = query.offset(skip).limit(limit).order_by(Property.created_at.desc())
-
-    result = await db.execute(query)
-    properties = result.scalars().all()
-
-    # Transform to flattened response format
-    pipeline_items = []
-    for prop in properties:
-        status = prop.pipeline_status
-        broker = prop.broker_info
-
-        item = PipelineItemResponse(
-            id=prop.id,
-            name=prop.name,
-            address=prop.address,
-            city=prop.city,
-            state=prop.state,
-            zone=prop.zone,
-            phase=status.phase if status else None,
-            priority=status.priority if status else None,
-            on_off_market=status.on_off_market if status else None,
-            date_added=status.date_added if status else None,
-            offer_due=status.offer_due if status else None,
-            asking_price=status.asking_price if status else None,
-            unit_count=status.unit_count if status else None,
-            vintage=status.vintage if status else None,
-            price_per_unit=status.price_per_unit if status else None,
-            pass_reason=status.pass_reason if status else None,
-            screener_link=status.screener_link if status else None,
-            notes=status.notes if status else None,
-            source=broker.source if broker else None,
-            broker_name=broker.broker_name if broker else None,
-        )
-        pipeline_items.append(item)
+    rows = result.all()
+
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1])
 
-    return pipeline_items
+    # The response model only documents the schema and isn't used to
+    # serialize; big pages are encoded in a worker thread to keep the event
+    # loop free for other requests
+    if len(rows) >= SERIALIZE_IN_THREAD_MIN_ROWS:
+        body = await asyncio.to_thread(_serialize_pipeline_rows, rows)
+    else:
+        body = _serialize_pipeline_rows(rows)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/db/export")
+async def export_pipeline_from_db(
+    phase: Optional[str] = None,
+    zone: Optional[str] = None,
+    priority: Optional[str] = None,
+):
+    """
+    Stream the whole pipeline from the database as NDJSON.
+
+    One PipelineItemResponse object per line. Rows are fetched in batches
+    and written as they arrive, so memory stays flat however many
+    properties match.
+
+    - **phase**: Filter by pipeline phase
+    - **zone**: Filter by geographic zone
+    - **priority**: Filter by priority level
+    """
+    query = _pipeline_db_query(phase=phase, zone=zone, priority=priority)
+
+    async def stream_items():
+        # The stream outlives the request handler, so it owns its session
+        async with async_session_maker() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for row in result:
+                yield orjson.dumps(dict(zip(_PIPELINE_ITEM_KEYS, row))) + b"\n"
+
+    return StreamingResponse(stream_items(), media_type="application/x-ndjson")
 
 
 @router.put("/{property_id}/status", response_model=PipelineItemResponse)
@@ -363,64 +702,30 @@ async def update_pipeline_status(
 
     Use this to update phase, priority, notes, pass reason, etc.
     """
+    # Create or update the status row in one statement
+    update_data = status_data.model_dump(exclude_unset=True)
     result = await db.execute(
-        select(Property)
-        .options(
-            selectinload(Property.pipeline_status),
-            selectinload(Property.broker_info),
-        )
-        .where(Property.id == property_id)
+        _upsert_for_property(db, PipelineStatus, property_id, update_data)
     )
-    property = result.scalar_one_or_none()
 
-    if not property:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    # Create pipeline status if it doesn't exist
-    if not property.pipeline_status:
-        property.pipeline_status = PipelineStatus(property_id=property_id)
-        db.add(property.pipeline_status)
-
-    # Update fields that were provided
-    update_data = status_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(property.pipeline_status, field, value)
+    result = await db.execute(PROPERTY_DETAIL_QUERY.where(Property.id == property_id))
+    property = result.scalar_one()
 
     await db.commit()
-    await db.refresh(property)
-
-    # Return flattened response
-    status = property.pipeline_status
-    broker = property.broker_info
-
-    return PipelineItemResponse(
-        id=property.id,
-        name=property.name,
-        address=property.address,
-        city=property.city,
-        state=property.state,
-        zone=property.zone,
-        phase=status.phase if status else None,
-        priority=status.priority if status else None,
-        on_off_market=status.on_off_market if status else None,
-        date_added=status.date_added if status else None,
-        offer_due=status.offer_due if status else None,
-        asking_price=status.asking_price if status else None,
-        unit_count=status.unit_count if status else None,
-        vintage=status.vintage if status else None,
-        price_per_unit=status.price_per_unit if status else None,
-        pass_reason=status.pass_reason if status else None,
-        screener_link=status.screener_link if status else None,
-        notes=status.notes if status else None,
-        source=broker.source if broker else None,
-        broker_name=broker.broker_name if broker else None,
-    )
+    await invalidate_pipeline_stats()
+    clear_property_cache()
+
+    # Return the flattened row without validating it through the response model
+    return ORJSONResponse(content=_pipeline_item_dict(property))
 
 
 @router.put("/{property_id}/phase")
 async def update_phase(
     property_id: int,
-    phase: str = Query(..., description="New phase value"),
+    phase: PipelinePhase = Query(..., description="New phase value"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -428,33 +733,22 @@ async def update_phase(
 
     Valid phases: Initial Review, Screener, LOI, Under Contract, Closed, Passed
     """
-    valid_phases = [
-        "Initial Review",
-        "Screener",
-        "LOI",
-        "Under Contract",
-        "Closed",
-        "Passed",
-    ]
-
-    if phase not in valid_phases:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid phase. Must be one of: {valid_phases}",
-        )
-
+    # Update and check existence in one round-trip
     result = await db.execute(
-        select(PipelineStatus).where(PipelineStatus.property_id == property_id)
+        update(PipelineStatus)
+        .where(PipelineStatus.property_id == property_id)
+        .values(phase=phase.value)
+        .returning(PipelineStatus.id)
     )
-    status = result.scalar_one_or_none()
 
-    if not status:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    status.phase = phase
     await db.commit()
+    await invalidate_pipeline_stats()
+    clear_property_cache()
 
-    return {"status": "updated", "property_id": property_id, "phase": phase}
+    return {"status": "updated", "property_id": property_id, "phase": phase.value}
 
 
 @router.put("/{property_id}/broker", response_model=dict)
@@ -466,69 +760,104 @@ async def update_broker_info(
     """
     Update broker information for a property.
     """
+    # Create or update the broker row in one statement
+    update_data = broker_data.model_dump(exclude_unset=True)
     result = await db.execute(
-        select(Property)
-        .options(selectinload(Property.broker_info))
-        .where(Property.id == property_id)
+        _upsert_for_property(db, BrokerInfo, property_id, update_data)
     )
-    property = result.scalar_one_or_none()
 
-    if not property:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    # Create broker info if it doesn't exist
-    if not property.broker_info:
-        property.broker_info = BrokerInfo(property_id=property_id)
-        db.add(property.broker_info)
-
-    # Update fields that were provided
-    update_data = broker_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(property.broker_info, field, value)
-
     await db.commit()
+    clear_property_cache()
 
     return {"status": "updated", "property_id": property_id}
 
 
-@router.get("/stats", response_model=PipelineStatsResponse)
+async def _compute_pipeline_stats(db: AsyncSession) -> PipelineStatsResponse:
+    """Count properties in total and by phase, zone and priority."""
+    # All four counts in one round-trip, tagged by which breakdown they belong to
+    stats_query = union_all(
+        select(literal("total").label("kind"), null().label("value"), func.count(Property.id)),
+        select(literal("phase"), PipelineStatus.phase, func.count(PipelineStatus.id))
+        .group_by(PipelineStatus.phase),
+        select(literal("zone"), Property.zone, func.count(Property.id))
+        .group_by(Property.zone),
+        select(literal("priority"), PipelineStatus.priority, func.count(PipelineStatus.id))
+        .group_by(PipelineStatus.priority),
+    )
+    result = await db.execute(stats_query)
+
+    total = 0
+    breakdowns = {"phase": {}, "zone": {}, "priority": {}}
+    for kind, value, count in result.all():
+        if kind == "total":
+            total = count
+        else:
+            breakdowns[kind][value or "Unknown"] = count
+
+    return PipelineStatsResponse(
+        total_properties=total,
+        by_phase=breakdowns["phase"],
+        by_zone=breakdowns["zone"],
+        by_priority=breakdowns["priority"],
+    )
+
+
+async def _get_pipeline_stats_from_redis(redis, db: AsyncSession) -> bytes:
+    """Return serialized stats from Redis, computing and storing them on a miss."""
+    version = await redis.get(STATS_REDIS_VERSION_KEY) or b"0"
+    key = f"pipeline:stats:v{version.decode()}"
+
+    body = await redis.get(key)
+    if body is None:
+        stats = await _compute_pipeline_stats(db)
+        body = orjson.dumps(stats.model_dump())
+        await redis.set(key, body, ex=STATS_REDIS_TTL_SECONDS)
+    return body
+
+
+@router.api_route("/stats", methods=["GET", "HEAD"], response_model=PipelineStatsResponse)
 async def get_pipeline_stats(
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get pipeline statistics - counts by phase, zone, priority.
-    """
-    # Total count
-    total_result = await db.execute(select(func.count(Property.id)))
-    total = total_result.scalar()
-
-    # Count by phase
-    phase_result = await db.execute(
-        select(PipelineStatus.phase, func.count(PipelineStatus.id))
-        .group_by(PipelineStatus.phase)
-    )
-    by_phase = {row[0] or "Unknown": row[1] for row in phase_result.all()}
 
-    # Count by zone
-    zone_result = await db.execute(
-        select(Property.zone, func.count(Property.id))
-        .group_by(Property.zone)
-    )
-    by_zone = {row[0] or "Unknown": row[1] for row in zone_result.all()}
-
-    # Count by priority
-    priority_result = await db.execute(
-        select(PipelineStatus.priority, func.count(PipelineStatus.id))
-        .group_by(PipelineStatus.priority)
-    )
-    by_priority = {row[0] or "Unknown": row[1] for row in priority_result.all()}
+    Stats are cached for a few seconds (in Redis when configured, otherwise
+    per worker) and invalidated by pipeline writes. Responses carry an ETag,
+    so polling clients get a 304 while the stats are unchanged.
+    """
+    redis = get_redis()
+    if redis is not None:
+        try:
+            body = await _get_pipeline_stats_from_redis(redis, db)
+            return _stats_response(request, body)
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for stats, using local cache: {e}")
+
+    body = _get_cached_stats()
+    if body is not None:
+        return _stats_response(request, body)
+
+    async with _stats_lock:
+        # Another request may have refreshed the cache while we waited
+        body = _get_cached_stats()
+        if body is None:
+            # Writes that land while querying leave the result already stale
+            version = pipeline_stats_version()
+
+            stats = await _compute_pipeline_stats(db)
+            body = orjson.dumps(stats.model_dump())
+            _stats_cache.update(
+                body=body,
+                expires=time.monotonic() + STATS_TTL_SECONDS,
+                version=version,
+            )
 
-    return PipelineStatsResponse(
-        total_properties=total,
-        by_phase=by_phase,
-        by_zone=by_zone,
-        by_priority=by_priority,
-    )
+    return _stats_response(request, body)
 
 
 # TODO: Add bulk status update endpoint
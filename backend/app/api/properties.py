@@ -6,20 +6,36 @@ Provides basic Create, Read, Update, Delete operations for properties.
 NEW: Also provides Box-based property reading as source of truth.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+import asyncio
 import logging
-import re
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+import orjson
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.api.common import (
+    PROPERTY_DETAIL_QUERY,
+    after_cursor,
+    clean_property_name,
+    encode_cursor,
+)
+from app.cache import (
+    cache_property_response,
+    clear_property_cache,
+    get_cached_property_response,
+    invalidate_pipeline_stats,
+    property_cache_generation,
+)
 from app.database import get_db
-from app.models.property import Property, PipelineStatus, BrokerInfo
-from app.services.box_service import get_box_service
+from app.models.property import Property, PipelineStatus, BrokerInfo, ScreenerData, ScreenerRun, utcnow
+from app.responses import ORJSONResponse
+from app.services.box_service import BoxService, get_app_box_service, list_folders_concurrently
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +44,18 @@ router = APIRouter()
 # Box folder path for properties
 BOX_PROPERTIES_PATH = "3. Underwriting Pipeline/Screener/Properties"
 
+# Upper bound on properties accepted by one batch create request
+MAX_BATCH_SIZE = 500
+
+# Listing statement base built once at import; endpoints only add their filters.
+# Listings selectin-load relations for many parents, while single-property
+# fetches use PROPERTY_DETAIL_QUERY, which joins them into the one row
+_PROPERTY_LIST_QUERY = select(Property).options(
+    selectinload(Property.pipeline_status),
+    selectinload(Property.broker_info),
+    raiseload("*"),
+)
+
 
 # ----- Pydantic Schemas -----
 
@@ -35,7 +63,7 @@ BOX_PROPERTIES_PATH = "3. Underwriting Pipeline/Screener/Properties"
 class PipelineStatusSchema(BaseModel):
     """Schema for pipeline status data."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: Optional[int] = None
     phase: Optional[str] = "Initial Review"
@@ -56,7 +84,7 @@ class PipelineStatusSchema(BaseModel):
 class BrokerInfoSchema(BaseModel):
     """Schema for broker information."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: Optional[int] = None
     source: Optional[str] = None
@@ -100,7 +128,7 @@ class PropertyUpdate(BaseModel):
 class PropertyResponse(BaseModel):
     """Schema for property response."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: int
     name: str
@@ -141,55 +169,113 @@ class BoxPropertyListResponse(BaseModel):
     total_count: int
 
 
+# Fields serialized for each part of a PropertyResponse
+_PROPERTY_FIELDS = tuple(
+    field for field in PropertyResponse.model_fields
+    if field not in ("pipeline_status", "broker_info")
+)
+_PIPELINE_STATUS_FIELDS = tuple(PipelineStatusSchema.model_fields)
+_BROKER_INFO_FIELDS = tuple(BrokerInfoSchema.model_fields)
+
+
 # ----- Helper Functions -----
 
 
-def clean_property_name(folder_name: str) -> str:
-    """Convert folder name to readable property name."""
-    spaced = re.sub(r'(?<!^)(?=[A-Z])', ' ', folder_name)
-    spaced = spaced.replace('_', ' ')
-    return spaced.strip()
+def _property_dict(prop: Property) -> dict:
+    """
+    Build a PropertyResponse-shaped dict straight from the ORM object.
+
+    Lets list endpoints hand rows to orjson without validating each one
+    through Pydantic first.
+    """
+    status = prop.pipeline_status
+    broker = prop.broker_info
+
+    data = {field: getattr(prop, field) for field in _PROPERTY_FIELDS}
+    data["pipeline_status"] = (
+        {field: getattr(status, field) for field in _PIPELINE_STATUS_FIELDS}
+        if status is not None else None
+    )
+    data["broker_info"] = (
+        {field: getattr(broker, field) for field in _BROKER_INFO_FIELDS}
+        if broker is not None else None
+    )
+    return data
+
+
+def public_folder_contents(contents: List[dict]) -> List[dict]:
+    """
+    Reduce Box listing entries to the id, name and type the API returns.
+
+    Listings also carry internal fields (file SHA-1s used to skip downloads).
+    """
+    return [
+        {'id': item['id'], 'name': item['name'], 'type': item['type']}
+        for item in contents
+    ]
 
 
-async def get_property_from_box(folder_id: str) -> Optional[BoxPropertyDetail]:
+def summarize_folder_contents(contents: List[dict]) -> Dict[str, bool]:
+    """
+    Check which kinds of output a property folder contains.
+
+    Lower-cases each name once and stops early once every flag is set.
+    """
+    has_screener = has_costar = has_maps = has_logs = False
+
+    for item in contents:
+        name = item['name'].lower()
+        if 'screener' in name or 'output' in name:
+            has_screener = True
+        if 'costar' in name:
+            has_costar = True
+        if 'map' in name:
+            has_maps = True
+        if 'log' in name:
+            has_logs = True
+        if has_screener and has_costar and has_maps and has_logs:
+            break
+
+    return {
+        'has_screener_output': has_screener,
+        'has_costar_reports': has_costar,
+        'has_maps': has_maps,
+        'has_logs': has_logs,
+    }
+
+
+async def get_property_from_box(box_service: BoxService, folder_id: str) -> Optional[BoxPropertyDetail]:
     """
     Get property details from Box by folder ID.
     """
-    box_service = get_box_service()
 
     if not box_service.is_connected():
         return None
 
     try:
-        contents = box_service.list_folder(folder_id)
-
-        # Analyze folder contents
-        has_screener = any('screener' in item['name'].lower() or 'output' in item['name'].lower() for item in contents)
-        has_costar = any('costar' in item['name'].lower() for item in contents)
-        has_maps = any('map' in item['name'].lower() for item in contents)
-        has_logs = any('log' in item['name'].lower() for item in contents)
+        contents = await asyncio.to_thread(box_service.list_folder, folder_id)
 
         return BoxPropertyDetail(
             id=folder_id,
             name="",  # Will be set by caller
             zone=None,  # Will be set by caller
             folder_path="",  # Will be set by caller
-            contents=contents,
-            has_screener_output=has_screener,
-            has_costar_reports=has_costar,
-            has_maps=has_maps,
-            has_logs=has_logs
+            contents=public_folder_contents(contents),
+            **summarize_folder_contents(contents),
         )
     except Exception as e:
         logger.error(f"Error getting property from Box: {e}")
         return None
 
 
-async def list_properties_from_box(zone_filter: Optional[str] = None, search: Optional[str] = None) -> BoxPropertyListResponse:
+async def list_properties_from_box(
+    box_service: BoxService,
+    zone_filter: Optional[str] = None,
+    search: Optional[str] = None,
+) -> BoxPropertyListResponse:
     """
     List all properties from Box folder structure.
     """
-    box_service = get_box_service()
 
     if not box_service.is_connected():
         return BoxPropertyListResponse(
@@ -200,7 +286,9 @@ async def list_properties_from_box(zone_filter: Optional[str] = None, search: Op
         )
 
     try:
-        properties_folder_id = box_service.find_folder(BOX_PROPERTIES_PATH)
+        properties_folder_id = await asyncio.to_thread(
+            box_service.find_folder, BOX_PROPERTIES_PATH
+        )
 
         if not properties_folder_id:
             return BoxPropertyListResponse(
@@ -210,21 +298,22 @@ async def list_properties_from_box(zone_filter: Optional[str] = None, search: Op
                 total_count=0
             )
 
-        zone_folders = box_service.list_folder(properties_folder_id)
-        properties = []
-
-        for zone_folder in zone_folders:
-            if zone_folder['type'] != 'folder':
-                continue
-
-            zone_name = zone_folder['name']
+        zone_folders = await asyncio.to_thread(box_service.list_folder, properties_folder_id)
 
-            # Apply zone filter if provided
-            if zone_filter and zone_name != zone_filter:
-                continue
+        # Apply zone filter if provided
+        zone_folders = [
+            zone_folder for zone_folder in zone_folders
+            if zone_folder['type'] == 'folder'
+            and not (zone_filter and zone_folder['name'] != zone_filter)
+        ]
 
-            property_folders = box_service.list_folder(zone_folder['id'])
+        # List property folders in every zone concurrently
+        zone_listings = await list_folders_concurrently(
+            box_service, [zone_folder['id'] for zone_folder in zone_folders]
+        )
 
+        prop_folders = []
+        for zone_folder, property_folders in zip(zone_folders, zone_listings):
             for prop_folder in property_folders:
                 if prop_folder['type'] != 'folder':
                     continue
@@ -235,19 +324,24 @@ async def list_properties_from_box(zone_filter: Optional[str] = None, search: Op
                 if search and search.lower() not in prop_name.lower():
                     continue
 
-                prop_contents = box_service.list_folder(prop_folder['id'])
+                prop_folders.append((zone_folder['name'], prop_name, prop_folder))
 
-                properties.append(BoxPropertyDetail(
-                    id=prop_folder['id'],
-                    name=prop_name,
-                    zone=zone_name,
-                    folder_path=f"{BOX_PROPERTIES_PATH}/{zone_name}/{prop_folder['name']}",
-                    contents=prop_contents,
-                    has_screener_output=any('screener' in item['name'].lower() or 'output' in item['name'].lower() for item in prop_contents),
-                    has_costar_reports=any('costar' in item['name'].lower() for item in prop_contents),
-                    has_maps=any('map' in item['name'].lower() for item in prop_contents),
-                    has_logs=any('log' in item['name'].lower() for item in prop_contents)
-                ))
+        # List the contents of every matching property concurrently
+        prop_listings = await list_folders_concurrently(
+            box_service, [prop_folder['id'] for _, _, prop_folder in prop_folders]
+        )
+
+        properties = []
+
+        for (zone_name, prop_name, prop_folder), prop_contents in zip(prop_folders, prop_listings):
+            properties.append(BoxPropertyDetail(
+                id=prop_folder['id'],
+                name=prop_name,
+                zone=zone_name,
+                folder_path=f"{BOX_PROPERTIES_PATH}/{zone_name}/{prop_folder['name']}",
+                contents=public_folder_contents(prop_contents),
+                **summarize_folder_contents(prop_contents),
+            ))
 
         return BoxPropertyListResponse(
             properties=properties,
@@ -269,10 +363,11 @@ async def list_properties_from_box(zone_filter: Optional[str] = None, search: Op
 # ----- API Endpoints -----
 
 
-@router.get("/", response_model=BoxPropertyListResponse)
+@router.get("/", response_model=BoxPropertyListResponse, response_class=ORJSONResponse)
 async def list_properties(
     zone: Optional[str] = None,
     search: Optional[str] = None,
+    box_service: BoxService = Depends(get_app_box_service),
 ):
     """
     List all properties from Box folder structure (source of truth).
@@ -282,13 +377,16 @@ async def list_properties(
     - **zone**: Filter by zone folder name
     - **search**: Search by property name
     """
-    return await list_properties_from_box(zone_filter=zone, search=search)
+    result = await list_properties_from_box(box_service, zone_filter=zone, search=search)
+    # Already a validated model, so skip re-validating it as the response
+    return ORJSONResponse(content=result.model_dump())
 
 
-@router.get("/db", response_model=List[PropertyResponse])
+@router.get("/db", response_model=List[PropertyResponse], response_class=ORJSONResponse)
 async def list_properties_from_database(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     zone: Optional[str] = None,
     state: Optional[str] = None,
     search: Optional[str] = None,
@@ -301,14 +399,24 @@ async def list_properties_from_database(
 
     - **skip**: Number of records to skip (pagination)
     - **limit**: Maximum number of records to return
+    - **cursor**: Resume after the last item of a previous page (takes precedence over skip)
     - **zone**: Filter by zone
     - **state**: Filter by state
     - **search**: Search by property name
+
+    When a full page is returned, the X-Next-Cursor header holds the cursor
+    for the next page.
     """
-    query = select(Property).options(
-        selectinload(Property.pipeline_status),
-        selectinload(Property.broker_info),
-    )
+    # Repeated polls of the same page are served from the short-lived cache
+    cache_key = ("list", skip, limit, cursor, zone, state, search)
+    cached = get_cached_property_response(cache_key)
+    if cached is not None:
+        return Response(
+            content=cached["body"], media_type="application/json", headers=cached["headers"]
+        )
+    generation = property_cache_generation()
+
+    query = _PROPERTY_LIST_QUERY
 
     # Apply filters
     if zone:
@@ -318,11 +426,23 @@ async def list_properties_from_database(
     if search:
         query = query.where(Property.name.ilike(f"%{search}%"))
 
-    query = query.offset(skip).limit(limit).order_by(Property.created_at.desc())
+    if cursor:
+        query = query.where(after_cursor(cursor))
+    else:
+        query = query.offset(skip)
+
+    query = query.limit(limit).order_by(Property.created_at.desc(), Property.id.desc())
 
     result = await db.execute(query)
     properties = result.scalars().all()
-    return properties
+
+    headers = {}
+    if len(properties) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(properties[-1])
+
+    body = orjson.dumps([_property_dict(prop) for prop in properties])
+    cache_property_response(cache_key, body, generation, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/", response_model=PropertyResponse, status_code=201)
@@ -335,40 +455,27 @@ async def create_property(
 
     Optionally include pipeline_status and broker_info in the request body.
     """
-    # Create property
-    property = Property(
-        name=property_data.name,
-        address=property_data.address,
-        city=property_data.city,
-        state=property_data.state,
-        zip_code=property_data.zip_code,
-        zone=property_data.zone,
-        latitude=property_data.latitude,
-        longitude=property_data.longitude,
-    )
-    db.add(property)
-    await db.flush()  # Get the ID
+    # One timestamp for every row this request writes
+    now = utcnow()
 
     # Create pipeline status if provided (or create default)
     status_data = property_data.pipeline_status or PipelineStatusSchema()
     pipeline_status = PipelineStatus(
-        property_id=property.id,
         phase=status_data.phase,
         priority=status_data.priority,
         on_off_market=status_data.on_off_market,
-        date_added=status_data.date_added or datetime.utcnow(),
+        date_added=status_data.date_added or now,
         asking_price=status_data.asking_price,
         unit_count=status_data.unit_count,
         vintage=status_data.vintage,
         price_per_unit=status_data.price_per_unit,
         notes=status_data.notes,
     )
-    db.add(pipeline_status)
 
     # Create broker info if provided
+    broker_info = None
     if property_data.broker_info:
         broker_info = BrokerInfo(
-            property_id=property.id,
             source=property_data.broker_info.source,
             broker_name=property_data.broker_info.broker_name,
             broker_phone=property_data.broker_info.broker_phone,
@@ -376,21 +483,102 @@ async def create_property(
             om_link=property_data.broker_info.om_link,
             seller_story=property_data.broker_info.seller_story,
         )
-        db.add(broker_info)
+
+    # Create property; related rows are linked through the relationships, so
+    # everything is inserted on commit and the instance can be returned as-is
+    property = Property(
+        name=property_data.name,
+        address=property_data.address,
+        city=property_data.city,
+        state=property_data.state,
+        zip_code=property_data.zip_code,
+        zone=property_data.zone,
+        latitude=property_data.latitude,
+        longitude=property_data.longitude,
+        created_at=now,
+        updated_at=now,
+        pipeline_status=pipeline_status,
+        broker_info=broker_info,
+    )
+    db.add(property)
 
     await db.commit()
-    await db.refresh(property)
-
-    # Reload with relationships
-    result = await db.execute(
-        select(Property)
-        .options(
-            selectinload(Property.pipeline_status),
-            selectinload(Property.broker_info),
+    await invalidate_pipeline_stats()
+    clear_property_cache()
+
+    # Serialize the ORM object directly instead of validating it into a
+    # PropertyResponse first
+    return ORJSONResponse(content=_property_dict(property), status_code=201)
+
+
+@router.post("/batch", response_model=List[PropertyResponse], status_code=201)
+async def create_properties_batch(
+    payload: List[PropertyCreate],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create several properties in one request.
+
+    Each table gets a single multi-row INSERT ... RETURNING (SQLAlchemy's
+    insertmanyvalues), instead of one round trip per row as the ORM unit
+    of work would issue. Results come back in request order.
+    """
+    if not payload:
+        return ORJSONResponse(content=[], status_code=201)
+    if len(payload) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_SIZE} properties per batch",
         )
-        .where(Property.id == property.id)
+
+    now = utcnow()
+    nested = {"pipeline_status", "broker_info"}
+    properties = (await db.scalars(
+        insert(Property).returning(Property, sort_by_parameter_order=True),
+        [
+            {**item.model_dump(exclude=nested), "created_at": now, "updated_at": now}
+            for item in payload
+        ],
+    )).all()
+
+    status_rows = []
+    for item, prop in zip(payload, properties):
+        status_data = item.pipeline_status or PipelineStatusSchema()
+        row = status_data.model_dump(exclude={"id"})
+        row["property_id"] = prop.id
+        row["date_added"] = row["date_added"] or now
+        status_rows.append(row)
+    statuses = (await db.scalars(
+        insert(PipelineStatus).returning(PipelineStatus, sort_by_parameter_order=True),
+        status_rows,
+    )).all()
+
+    broker_rows = [
+        {**item.broker_info.model_dump(exclude={"id"}), "property_id": prop.id}
+        for item, prop in zip(payload, properties)
+        if item.broker_info is not None
+    ]
+    brokers = {}
+    if broker_rows:
+        brokers = {
+            broker.property_id: broker
+            for broker in await db.scalars(
+                insert(BrokerInfo).returning(BrokerInfo), broker_rows
+            )
+        }
+
+    await db.commit()
+    await invalidate_pipeline_stats()
+    clear_property_cache()
+
+    # Attach the returned rows so the response never lazy loads
+    for prop, status in zip(properties, statuses):
+        set_committed_value(prop, "pipeline_status", status)
+        set_committed_value(prop, "broker_info", brokers.get(prop.id))
+
+    return ORJSONResponse(
+        content=[_property_dict(prop) for prop in properties], status_code=201
     )
-    return result.scalar_one()
 
 
 @router.get("/{property_id}", response_model=PropertyResponse)
@@ -401,20 +589,21 @@ async def get_property(
     """
     Get a single property by ID.
     """
-    result = await db.execute(
-        select(Property)
-        .options(
-            selectinload(Property.pipeline_status),
-            selectinload(Property.broker_info),
-        )
-        .where(Property.id == property_id)
-    )
+    cache_key = ("detail", property_id)
+    cached = get_cached_property_response(cache_key)
+    if cached is not None:
+        return Response(content=cached["body"], media_type="application/json")
+    generation = property_cache_generation()
+
+    result = await db.execute(PROPERTY_DETAIL_QUERY.where(Property.id == property_id))
     property = result.scalar_one_or_none()
 
     if not property:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    return property
+    body = orjson.dumps(_property_dict(property))
+    cache_property_response(cache_key, body, generation)
+    return Response(content=body, media_type="application/json")
 
 
 @router.put("/{property_id}", response_model=PropertyResponse)
@@ -428,9 +617,8 @@ async def update_property(
 
     Use /api/pipeline/{id}/status for updating pipeline status.
     """
-    result = await db.execute(
-        select(Property).where(Property.id == property_id)
-    )
+    # Load the relations the response needs along with the property
+    result = await db.execute(PROPERTY_DETAIL_QUERY.where(Property.id == property_id))
     property = result.scalar_one_or_none()
 
     if not property:
@@ -441,19 +629,13 @@ async def update_property(
     for field, value in update_data.items():
         setattr(property, field, value)
 
+    # The session doesn't expire on commit, so the instance (including the
+    # new updated_at) is serialized as is, with no refresh or reload
     await db.commit()
-    await db.refresh(property)
-
-    # Reload with relationships
-    result = await db.execute(
-        select(Property)
-        .options(
-            selectinload(Property.pipeline_status),
-            selectinload(Property.broker_info),
-        )
-        .where(Property.id == property_id)
-    )
-    return result.scalar_one()
+    await invalidate_pipeline_stats()
+    clear_property_cache()
+
+    return ORJSONResponse(content=_property_dict(property))
 
 
 @router.delete("/{property_id}", status_code=204)
@@ -466,24 +648,23 @@ async def delete_property(
 
     This is a hard delete. Consider implementing soft delete for production.
     """
-    result = await db.execute(
-        select(Property).where(Property.id == property_id)
-    )
-    property = result.scalar_one_or_none()
+    # Bulk DELETEs without loading anything; the ORM cascade doesn't apply
+    # to them, so related rows are removed explicitly before the property
+    for model in (PipelineStatus, BrokerInfo, ScreenerData, ScreenerRun):
+        await db.execute(delete(model).where(model.property_id == property_id))
 
-    if not property:
+    result = await db.execute(delete(Property).where(Property.id == property_id))
+
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    await db.delete(property)
     await db.commit()
+    await invalidate_pipeline_stats()
+    clear_property_cache()
 
     return None
 
 
-# TODO: Add batch operations
-# @router.post("/batch", response_model=List[PropertyResponse])
-# async def create_properties_batch(...)
-
 # TODO: Add export endpoint
 # @router.get("/export/excel")
 # async def export_properties_to_excel(...)
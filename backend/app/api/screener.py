@@ -6,22 +6,79 @@ uploading PDFs, and retrieving results.
 """
 
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import select
+from sqlalchemy import insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.models.property import Property, ScreenerRun, ScreenerData
-from app.services.screener_service import ScreenerService
+from app.cache import RedisError
+from app.database import async_session_maker, get_db
+from app.models.property import Property, ScreenerRun, ScreenerData, utcnow
+from app.responses import ORJSONResponse
+from app.services.screener_service import ScreenerService, get_screener_service
+from app.worker import get_job_pool
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Largest CoStar PDF accepted, and how much of an upload is read at a time
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# How often a running screener's latest progress is written to the database
+PROGRESS_FLUSH_SECONDS = 1.0
+
+# A property can have only one screener run in these states at a time
+ACTIVE_RUN_STATUSES = ("pending", "running")
+
+# An active run older than this is assumed lost (its process restarted or
+# its queued job vanished) and is failed so it stops blocking new runs.
+# Age counts from creation while pending and from being claimed once
+# running; run_screener_task only writes to a run still in the status it
+# expects, so a run failed here is never revived
+STALE_RUN_SECONDS = 60 * 60
+
+# Built once at import; the status and runs endpoints add their filters
+_RUNS_NEWEST_FIRST = select(ScreenerRun).order_by(ScreenerRun.started_at.desc())
+
+
+async def fail_stale_runs(db: AsyncSession, property_id: Optional[int] = None) -> int:
+    """
+    Mark active runs older than STALE_RUN_SECONDS as failed.
+
+    Limited to one property if property_id is given. Returns the number of
+    runs failed; the caller commits.
+    """
+    now = utcnow()
+    stmt = (
+        update(ScreenerRun)
+        .where(
+            ScreenerRun.status.in_(ACTIVE_RUN_STATUSES),
+            or_(
+                ScreenerRun.started_at.is_(None),
+                ScreenerRun.started_at < now - timedelta(seconds=STALE_RUN_SECONDS),
+            ),
+        )
+        .values(
+            status="failed",
+            completed_at=now,
+            error_message="Screener run did not finish and was abandoned",
+        )
+    )
+    if property_id is not None:
+        stmt = stmt.where(ScreenerRun.property_id == property_id)
+
+    result = await db.execute(stmt)
+    return result.rowcount
+
 
 # ----- Pydantic Schemas -----
 
@@ -29,7 +86,7 @@ router = APIRouter()
 class ScreenerRunResponse(BaseModel):
     """Schema for screener run response."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: int
     property_id: int
@@ -46,7 +103,7 @@ class ScreenerRunResponse(BaseModel):
 class ScreenerDataResponse(BaseModel):
     """Schema for screener data response."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: int
     category: str
@@ -59,12 +116,44 @@ class ScreenerDataResponse(BaseModel):
 class ScreenerStartResponse(BaseModel):
     """Response when starting a screener run."""
 
+    model_config = ConfigDict(frozen=True)
+
     status: str
     run_id: int
     property_id: int
     message: str
 
 
+# Fields serialized for each response row
+_SCREENER_RUN_FIELDS = tuple(ScreenerRunResponse.model_fields)
+_SCREENER_DATA_FIELDS = tuple(ScreenerDataResponse.model_fields)
+
+
+def _row_dict(obj, fields) -> dict:
+    """Pick response fields off an ORM object for orjson, skipping Pydantic."""
+    return {field: getattr(obj, field) for field in fields}
+
+
+async def _upload_size(file: UploadFile) -> int:
+    """
+    Size of an uploaded file in bytes.
+
+    Uses the size recorded while the upload was spooled; otherwise counts
+    it in chunks, stopping once past the limit, so the file is never held
+    in memory whole.
+    """
+    if file.size is not None:
+        return file.size
+
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            break
+    await file.seek(0)
+    return size
+
+
 # ----- API Endpoints -----
 
 
@@ -87,53 +176,97 @@ async def start_screener(
     """
     # Verify property exists
     result = await db.execute(
-        select(Property).where(Property.id == property_id)
+        select(Property.name).where(Property.id == property_id)
     )
-    property = result.scalar_one_or_none()
+    property_name = result.scalar_one_or_none()
 
-    if not property:
+    if property_name is None:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    # Check for existing running screener
-    running_check = await db.execute(
-        select(ScreenerRun).where(
+    # A run left active by a lost process or job must not block this one
+    await fail_stale_runs(db, property_id)
+
+    # Create the run only if none is already active, in one statement; the
+    # unique partial index on active runs catches concurrent starts
+    active_run = (
+        select(ScreenerRun.id)
+        .where(
             ScreenerRun.property_id == property_id,
-            ScreenerRun.status == "running",
+            ScreenerRun.status.in_(ACTIVE_RUN_STATUSES),
         )
+        .exists()
     )
-    if running_check.scalar_one_or_none():
+    new_run = select(
+        literal(property_id),
+        literal("pending"),
+        literal(utcnow()),
+        literal("Initializing"),
+        literal(0),
+    ).where(~active_run)
+
+    try:
+        result = await db.execute(
+            insert(ScreenerRun)
+            .from_select(
+                ["property_id", "status", "started_at", "current_step", "progress_percent"],
+                new_run,
+            )
+            .returning(ScreenerRun.id)
+        )
+        run_id = result.scalar_one_or_none()
+    except IntegrityError:
+        run_id = None
+
+    if run_id is None:
         raise HTTPException(
             status_code=409,
             detail="Screener already running for this property",
         )
 
-    # Create new screener run record
-    screener_run = ScreenerRun(
-        property_id=property_id,
-        status="pending",
-        started_at=datetime.utcnow(),
-        current_step="Initializing",
-        progress_percent=0,
-    )
-    db.add(screener_run)
     await db.commit()
-    await db.refresh(screener_run)
 
-    # Queue background task
-    # TODO: Replace with actual screener service integration
-    background_tasks.add_task(
-        run_screener_task,
-        run_id=screener_run.id,
-        property_id=property_id,
-        property_name=property.name,
-    )
+    # Hand the run to the worker process when one is configured, otherwise
+    # run it after the response in this process
+    queued = False
+    try:
+        # Connecting to Redis happens here on first use, so a down or
+        # misconfigured Redis also falls back instead of failing the request
+        job_pool = await get_job_pool()
+        if job_pool is not None:
+            await job_pool.enqueue_job("run_screener", run_id, property_id, property_name)
+            queued = True
+    except (RedisError, OSError) as e:
+        logger.warning(f"Could not queue screener run {run_id}, running in-process: {e}")
+
+    if not queued:
+        background_tasks.add_task(
+            run_screener_task,
+            run_id=run_id,
+            property_id=property_id,
+            property_name=property_name,
+        )
 
     return ScreenerStartResponse(
         status="started",
-        run_id=screener_run.id,
+        run_id=run_id,
         property_id=property_id,
-        message=f"Screener started for property: {property.name}",
+        message=f"Screener started for property: {property_name}",
+    )
+
+
+async def _update_run(db: AsyncSession, run_id: int, expected_status: str, **values) -> bool:
+    """
+    Write to a run only while it is still in expected_status, and commit.
+
+    Returns False if the run has moved on, e.g. it was failed as stale.
+    """
+    result = await db.execute(
+        update(ScreenerRun)
+        .where(ScreenerRun.id == run_id, ScreenerRun.status == expected_status)
+        .values(**values)
     )
+    await db.commit()
+    return result.rowcount == 1
 
 
 async def run_screener_task(run_id: int, property_id: int, property_name: str):
@@ -142,59 +275,92 @@ async def run_screener_task(run_id: int, property_id: int, property_name: str):
 
     Integrates with the actual ScreenerService to run property analysis.
     """
-    from app.database import async_session_maker
-    from app.services.screener_service import get_screener_service
-
     async with async_session_maker() as db:
-        # Get the run record
-        result = await db.execute(
-            select(ScreenerRun).where(ScreenerRun.id == run_id)
+        # Claim the run atomically; one already failed as stale (or picked
+        # up elsewhere) is left alone
+        claimed = await _update_run(
+            db, run_id, "pending",
+            status="running",
+            started_at=utcnow(),
+            current_step="Starting screener analysis",
+            progress_percent=5,
         )
-        run = result.scalar_one()
+        if not claimed:
+            logger.warning(f"Screener run {run_id} is no longer pending, not starting it")
+            return
 
         try:
-            # Update status to running
-            run.status = "running"
-            run.current_step = "Starting screener analysis"
-            run.progress_percent = 5
-            await db.commit()
-
-            # Progress callback to update database
-            async def update_progress(progress):
-                run.current_step = progress.step
-                run.progress_percent = progress.percent
-                await db.commit()
+            # The screener reports progress synchronously; keep only the
+            # latest report and persist it at most once per interval
+            latest_progress = None
+            analysis_done = asyncio.Event()
+
+            def update_progress(progress):
+                nonlocal latest_progress
+                latest_progress = progress
+
+            async def flush_progress():
+                written = None
+                while not analysis_done.is_set():
+                    try:
+                        await asyncio.wait_for(analysis_done.wait(), PROGRESS_FLUSH_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    if latest_progress is not written and not analysis_done.is_set():
+                        written = latest_progress
+                        still_running = await _update_run(
+                            db, run_id, "running",
+                            current_step=written.step,
+                            progress_percent=written.percent,
+                        )
+                        if not still_running:
+                            return
+
+            flusher = asyncio.create_task(flush_progress())
 
             # Run the actual screener
             service = get_screener_service()
-            screener_result = await service.run_analysis(
-                property_id=property_id,
-                property_name=property_name,
-            )
+            try:
+                screener_result = await service.run_analysis(
+                    property_id=property_id,
+                    property_name=property_name,
+                    progress_callback=update_progress,
+                )
+            finally:
+                # Let an in-flight progress commit finish before writing the result
+                analysis_done.set()
+                await flusher
 
             if screener_result.success:
-                run.status = "completed"
-                run.completed_at = datetime.utcnow()
-                run.current_step = "Complete"
-                run.progress_percent = 100
-                run.output_excel_path = screener_result.output_excel_path
+                outcome = {
+                    "status": "completed",
+                    "completed_at": utcnow(),
+                    "current_step": "Complete",
+                    "progress_percent": 100,
+                    "output_excel_path": screener_result.output_excel_path,
+                }
                 if screener_result.maps_generated:
-                    run.maps_generated = screener_result.maps_generated
+                    outcome["maps_generated"] = screener_result.maps_generated
             else:
-                run.status = "failed"
-                run.error_message = screener_result.error_message
-                run.completed_at = datetime.utcnow()
+                outcome = {
+                    "status": "failed",
+                    "error_message": screener_result.error_message,
+                    "completed_at": utcnow(),
+                }
 
-            await db.commit()
+            await _update_run(db, run_id, "running", **outcome)
 
         except Exception as e:
-            run.status = "failed"
-            run.error_message = str(e)
-            run.completed_at = datetime.utcnow()
-            await db.commit()
+            await db.rollback()
+            await _update_run(
+                db, run_id, "running",
+                status="failed",
+                error_message=str(e),
+                completed_at=utcnow(),
+            )
 
 
-@router.get("/{property_id}/status", response_model=ScreenerRunResponse)
+@router.get("/{property_id}/status", response_model=ScreenerRunResponse, response_class=ORJSONResponse)
 async def get_screener_status(
     property_id: int,
     db: AsyncSession = Depends(get_db),
@@ -203,9 +369,8 @@ async def get_screener_status(
     Get the status of the most recent screener run for a property.
     """
     result = await db.execute(
-        select(ScreenerRun)
+        _RUNS_NEWEST_FIRST
         .where(ScreenerRun.property_id == property_id)
-        .order_by(ScreenerRun.started_at.desc())
         .limit(1)
     )
     run = result.scalar_one_or_none()
@@ -216,10 +381,10 @@ async def get_screener_status(
             detail="No screener runs found for this property",
         )
 
-    return run
+    return ORJSONResponse(content=_row_dict(run, _SCREENER_RUN_FIELDS))
 
 
-@router.get("/{property_id}/runs", response_model=List[ScreenerRunResponse])
+@router.get("/{property_id}/runs", response_model=List[ScreenerRunResponse], response_class=ORJSONResponse)
 async def list_screener_runs(
     property_id: int,
     limit: int = Query(10, ge=1, le=50),
@@ -229,16 +394,16 @@ async def list_screener_runs(
     List all screener runs for a property.
     """
     result = await db.execute(
-        select(ScreenerRun)
+        _RUNS_NEWEST_FIRST
         .where(ScreenerRun.property_id == property_id)
-        .order_by(ScreenerRun.started_at.desc())
         .limit(limit)
     )
-    runs = result.scalars().all()
-    return runs
+    return ORJSONResponse(
+        content=[_row_dict(run, _SCREENER_RUN_FIELDS) for run in result.scalars()]
+    )
 
 
-@router.get("/{property_id}/data", response_model=List[ScreenerDataResponse])
+@router.get("/{property_id}/data", response_model=List[ScreenerDataResponse], response_class=ORJSONResponse)
 async def get_screener_data(
     property_id: int,
     category: Optional[str] = None,
@@ -255,8 +420,9 @@ async def get_screener_data(
         query = query.where(ScreenerData.category == category)
 
     result = await db.execute(query.order_by(ScreenerData.category, ScreenerData.field_name))
-    data = result.scalars().all()
-    return data
+    return ORJSONResponse(
+        content=[_row_dict(row, _SCREENER_DATA_FIELDS) for row in result.scalars()]
+    )
 
 
 @router.post("/{property_id}/upload")
@@ -282,9 +448,9 @@ async def upload_pdf(
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
-    # Check file size (50MB limit)
-    content = await file.read()
-    if len(content) > 50 * 1024 * 1024:
+    # Check file size (50MB limit) without reading the upload into memory
+    size = await _upload_size(file)
+    if size > MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=400, detail="File too large (max 50MB)")
 
     # Verify property exists
@@ -302,14 +468,14 @@ async def upload_pdf(
     # folder.mkdir(parents=True, exist_ok=True)
     # file_path = folder / file.filename
     # with open(file_path, "wb") as f:
-    #     f.write(content)
+    #     shutil.copyfileobj(file.file, f, UPLOAD_CHUNK_BYTES)
 
     return {
         "status": "uploaded",
         "property_id": property_id,
         "filename": file.filename,
         "pdf_type": pdf_type,
-        "size_bytes": len(content),
+        "size_bytes": size,
         # "path": str(file_path),  # TODO: Return actual path
     }
 
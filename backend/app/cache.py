@@ -0,0 +1,133 @@
+"""
+Optional Redis cache shared across workers.
+
+Used for data that is expensive to compute and read often, such as
+pipeline stats. Disabled unless REDIS_URL is set, in which case callers
+fall back to their own in-process caching.
+
+Also holds the in-process caches that both the properties and pipeline
+routers (and Box re-auth) invalidate: serialized property responses, the
+pipeline stats version and cached Box listings.
+"""
+
+from typing import Any, Dict, Hashable, Optional
+import logging
+import time
+
+from app.config import settings
+
+# Lazy import for redis to handle missing package gracefully
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    RedisError = Exception
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Singleton client
+_redis = None
+
+# How long serialized property responses are reused. Kept short because
+# other worker processes only drop their entries once these expire
+PROPERTY_CACHE_TTL_SECONDS = 5
+PROPERTY_CACHE_MAX_ENTRIES = 1024
+
+# Serialized property responses keyed by endpoint and arguments: {"body", "headers", "expires"}
+_property_cache: Dict[Hashable, Dict[str, Any]] = {}
+
+# Bumped by every clear, so a response read before a write can't be cached after it
+_property_cache_generation = 0
+
+# Redis key for the stats version shared across workers; writes bump it so
+# stale entries are never read and simply expire
+STATS_REDIS_VERSION_KEY = "pipeline:stats:ver"
+
+# Local stats version; bumping it on writes invalidates cached stats before their TTL runs out
+_pipeline_stats_version = 0
+
+# Cached Box listings keyed by Box path: {"value", "body", "expires", "fetched_at"}
+box_listing_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Get the shared Redis client, or None if Redis isn't configured."""
+    global _redis
+    if _redis is None and settings.redis_url:
+        if not REDIS_AVAILABLE:
+            logger.warning("REDIS_URL is set but the redis package is not installed")
+            return None
+        _redis = aioredis.from_url(settings.redis_url)
+    return _redis
+
+
+def get_cached_property_response(key: Hashable) -> Optional[Dict[str, Any]]:
+    """Return a cached property response entry if it hasn't expired."""
+    entry = _property_cache.get(key)
+    if entry is None:
+        return None
+    if entry["expires"] <= time.monotonic():
+        _property_cache.pop(key, None)
+        return None
+    return entry
+
+
+def property_cache_generation() -> int:
+    """Current property cache generation; read it before querying the rows to cache."""
+    return _property_cache_generation
+
+
+def cache_property_response(
+    key: Hashable,
+    body: bytes,
+    generation: int,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Cache a serialized property response, evicting the oldest entry when full.
+
+    Skipped if the cache was cleared since generation was read, since the
+    body may predate that write.
+    """
+    if generation != _property_cache_generation:
+        return
+    if key not in _property_cache and len(_property_cache) >= PROPERTY_CACHE_MAX_ENTRIES:
+        _property_cache.pop(next(iter(_property_cache)))
+    _property_cache[key] = {
+        "body": body,
+        "headers": headers or {},
+        "expires": time.monotonic() + PROPERTY_CACHE_TTL_SECONDS,
+    }
+
+
+def clear_property_cache() -> None:
+    """Forget cached property responses after properties or their relations change."""
+    global _property_cache_generation
+    _property_cache_generation += 1
+    _property_cache.clear()
+
+
+def pipeline_stats_version() -> int:
+    """Current local stats version; read it before computing the stats to cache."""
+    return _pipeline_stats_version
+
+
+async def invalidate_pipeline_stats() -> None:
+    """Invalidate cached pipeline stats after properties or statuses change."""
+    global _pipeline_stats_version
+    _pipeline_stats_version += 1
+
+    redis = get_redis()
+    if redis is not None:
+        try:
+            await redis.incr(STATS_REDIS_VERSION_KEY)
+        except RedisError as e:
+            logger.warning(f"Failed to invalidate stats in Redis: {e}")
+
+
+def clear_box_listing_cache() -> None:
+    """Forget cached Box listings so the next request reads Box again."""
+    box_listing_cache.clear()
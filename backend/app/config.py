@@ -23,6 +23,14 @@ class Settings(BaseSettings):
     # Database - use in-memory SQLite for cloud, file-based for local
     database_url: str = "sqlite+aiosqlite:///:memory:"
 
+    # Connection pool (Postgres only; SQLite uses a single connection)
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800  # seconds
+    db_disable_pool: bool = False  # Set when behind PgBouncer in transaction mode
+    db_statement_cache_size: int = 500  # asyncpg prepared statements per connection
+
     # API Keys
     anthropic_api_key: str = ""
 
@@ -34,6 +42,12 @@ class Settings(BaseSettings):
     properties_dir: str = ""
     template_excel: str = ""
 
+    # Cache - optional Redis shared by all workers (disabled when empty)
+    redis_url: str = ""
+
+    # Run screeners in a separate arq worker process (needs REDIS_URL)
+    screener_worker: bool = False
+
     # Authentication
     secret_key: str = "your-secret-key-change-in-production"
     access_token_expire_minutes: int = 1440  # 24 hours
@@ -4,20 +4,62 @@ Async SQLAlchemy database setup.
 Uses SQLAlchemy 2.0 async patterns with SQLite for MVP.
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, Tuple
 
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
 from app.config import settings
 
 
+def _engine_options() -> Dict[str, Any]:
+    """
+    Engine and connection pool options for the configured database.
+
+    Server databases get a pool sized for concurrent requests, with
+    pre-ping to drop dead connections. With an external pooler such as
+    PgBouncer, SQLAlchemy's own pooling is turned off instead.
+
+    asyncpg connections keep a cache of prepared statements so repeated
+    queries skip the parse/plan step; the cache is disabled behind an
+    external pooler, where a statement prepared on one server connection
+    may not exist on the next.
+    """
+    options: Dict[str, Any] = {"echo": settings.debug, "future": True}
+    url = settings.async_database_url
+
+    if url.startswith("sqlite"):
+        return options
+
+    is_asyncpg = url.startswith("postgresql+asyncpg")
+
+    if settings.db_disable_pool:
+        options["poolclass"] = NullPool
+        if is_asyncpg:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+            }
+        return options
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+    )
+    if is_asyncpg:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=settings.debug,
-    future=True,
-)
+engine = create_async_engine(settings.async_database_url, **_engine_options())
 
 # Session factory
 async_session_maker = async_sessionmaker(
@@ -30,7 +72,21 @@ async_session_maker = async_sessionmaker(
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
-    pass
+    # Attributes shown by repr(); models list the ones that identify a row
+    __repr_attrs__: Tuple[str, ...] = ("id",)
+
+    def __repr__(self) -> str:
+        """
+        Show the identifying attributes that are already loaded.
+
+        Reads the instance state directly, so printing an expired or
+        detached instance never triggers a database load.
+        """
+        loaded = inspect(self).dict
+        fields = ", ".join(
+            f"{name}={loaded[name]!r}" for name in self.__repr_attrs__ if name in loaded
+        )
+        return f"<{type(self).__name__}({fields})>"
 
 
 async def init_db() -> None:
@@ -43,16 +99,19 @@ async def init_db() -> None:
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for getting database session."""
+    """
+    Dependency for getting database session.
+
+    Nothing is committed here: endpoints that write commit their own
+    changes, so read-only requests end without a needless COMMIT.
+
+    The session only checks out a pool connection on its first query, so
+    requests answered from a cache or rejected early never touch the pool.
+    Leaving the context closes the session, which rolls back anything
+    uncommitted and returns the connection.
+    """
     async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+        yield session
 
 
 # TODO: Add migration support with Alembic
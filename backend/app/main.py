@@ -8,18 +8,38 @@ Run with: uvicorn app.main:app --reload
 """
 
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+import orjson
 
 from app.config import settings
-from app.database import init_db
+from app.database import async_session_maker, init_db
 from app.api import properties, pipeline, screener, auth
-from app.services.box_service import get_box_service
+from app.responses import ORJSONResponse
+from app.services.box_service import BoxService, get_app_box_service, get_box_service
 
 logger = logging.getLogger(__name__)
 
+# The probe endpoints only ever return these bodies, so they are serialized
+# once at import instead of on every request
+_ROOT_BODY = orjson.dumps({
+    "status": "ok",
+    "app": "RMP Pipeline Web App",
+    "version": "0.1.0",
+})
+_HEALTH_BODIES = {
+    box_connected: orjson.dumps({
+        "status": "healthy",
+        "database": "connected",
+        "box_connected": box_connected,
+        "box_warning": None if box_connected else "Box not connected. Check BOX_CONFIG_JSON environment variable.",
+    })
+    for box_connected in (True, False)
+}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -27,17 +47,32 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize database
     await init_db()
 
-    # Check Box connection status
+    # Fail screener runs abandoned by an earlier process so they don't keep
+    # blocking new runs for their property
+    async with async_session_maker() as db:
+        stale_runs = await screener.fail_stale_runs(db)
+        await db.commit()
+    if stale_runs:
+        logger.warning(f"Marked {stale_runs} abandoned screener run(s) as failed")
+
+    # Create the Box service once and share it with request handlers
     box_service = get_box_service()
+    app.state.box_service = box_service
+
+    # Check Box connection status; the tokens are verified with Box in the
+    # background so startup doesn't wait on an API round trip
     if box_service.is_connected():
-        logger.info("Box connection: CONNECTED")
+        logger.info("Box connection: CONNECTED (verifying tokens)")
+        verify_task = asyncio.create_task(asyncio.to_thread(box_service.verify_connection))
     else:
         logger.warning("Box connection: NOT CONNECTED - Properties will be unavailable")
         logger.warning("Ensure BOX_CONFIG_JSON environment variable is set correctly")
+        verify_task = None
 
     yield
-    # Shutdown: Clean up resources (if needed)
-    pass
+    # Shutdown: stop waiting on a verification that hasn't finished
+    if verify_task is not None and not verify_task.done():
+        verify_task.cancel()
 
 
 app = FastAPI(
@@ -45,6 +80,7 @@ app = FastAPI(
     description="Unified pipeline management tool for property underwriting",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware - allow frontend to access API
@@ -66,23 +102,15 @@ app.include_router(screener.router, prefix="/api/screener", tags=["Screener"])
 @app.get("/")
 async def root():
     """Root endpoint - health check."""
-    return {
-        "status": "ok",
-        "app": "RMP Pipeline Web App",
-        "version": "0.1.0",
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/api/health")
-async def health_check():
+async def health_check(box_service: BoxService = Depends(get_app_box_service)):
     """Health check endpoint."""
-    box_service = get_box_service()
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "box_connected": box_service.is_connected(),
-        "box_warning": None if box_service.is_connected() else "Box not connected. Check BOX_CONFIG_JSON environment variable.",
-    }
+    return Response(
+        content=_HEALTH_BODIES[box_service.is_connected()], media_type="application/json"
+    )
 
 
 # TODO: Add WebSocket/SSE endpoint for real-time progress updates
@@ -1,42 +1,52 @@
-"""Test FastAPI app - incrementally adding features to find failure point."""
+"""Test FastAPI app - incrementally adding features to find failure point.
 
+Progress is logged at DEBUG level; set APP_DIAGNOSE_IMPORTS=1 to print it.
+"""
+
+import logging
+import os
 import sys
-print(f"Python version: {sys.version}")
+
+logger = logging.getLogger(__name__)
+if os.environ.get("APP_DIAGNOSE_IMPORTS") == "1":
+    logging.basicConfig(level=logging.DEBUG)
+
+logger.debug(f"Python version: {sys.version}")
 
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.responses import ORJSONResponse
+
 # Import all modules like main.py does
-print("Importing app.config...")
+logger.debug("Importing app.config...")
 from app.config import settings
-print(f"OK - cors_origins={settings.cors_origins}")
+logger.debug(f"OK - cors_origins={settings.cors_origins}")
 
-print("Importing app.database...")
+logger.debug("Importing app.database...")
 from app.database import init_db
-print("OK")
+logger.debug("OK")
 
-print("Importing app.api routers...")
+logger.debug("Importing app.api routers...")
 from app.api import properties, pipeline, screener, auth
-print("OK")
+logger.debug("OK")
 
-print("\n=== All imports successful ===\n")
+logger.debug("=== All imports successful ===")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle manager - same as main.py."""
-    print("Lifespan: Calling init_db()...")
+    logger.debug("Lifespan: Calling init_db()...")
     try:
         await init_db()
-        print("Lifespan: init_db() completed successfully!")
-    except Exception as e:
-        print(f"Lifespan: init_db() FAILED - {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Lifespan: init_db() completed successfully!")
+    except Exception:
         # Re-raise to see if this is what kills the app
+        logger.exception("Lifespan: init_db() FAILED")
         raise
     yield
-    print("Lifespan: Shutdown")
+    logger.debug("Lifespan: Shutdown")
 
 # Create app exactly like main.py
 app = FastAPI(
@@ -44,10 +54,11 @@ app = FastAPI(
     description="Testing full app configuration",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware exactly like main.py
-print(f"Adding CORS middleware with origins: {settings.cors_origins}")
+logger.debug(f"Adding CORS middleware with origins: {settings.cors_origins}")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -57,12 +68,12 @@ app.add_middleware(
 )
 
 # Include routers exactly like main.py
-print("Including routers...")
+logger.debug("Including routers...")
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(properties.router, prefix="/api/properties", tags=["Properties"])
 app.include_router(pipeline.router, prefix="/api/pipeline", tags=["Pipeline"])
 app.include_router(screener.router, prefix="/api/screener", tags=["Screener"])
-print("Routers included successfully!")
+logger.debug("Routers included successfully!")
 
 @app.get("/")
 async def root():
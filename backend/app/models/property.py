@@ -4,15 +4,25 @@ SQLAlchemy models for the Pipeline Web App.
 Based on data model from WEB_APP_ARCHITECTURE.md Section 4.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
 
-from sqlalchemy import String, Integer, Float, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import String, Integer, Float, Text, DateTime, Boolean, ForeignKey, Index, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 
+def utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime.
+
+    The DateTime columns are timezone-naive, and asyncpg rejects aware values
+    for them, so the offset is dropped after reading the clock.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Property(Base):
     """
     Core property entity - the central object everything links to.
@@ -21,6 +31,7 @@ class Property(Base):
     """
 
     __tablename__ = "properties"
+    __repr_attrs__ = ("id", "name")
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), index=True)
@@ -28,7 +39,7 @@ class Property(Base):
     city: Mapped[Optional[str]] = mapped_column(String(100))
     state: Mapped[Optional[str]] = mapped_column(String(50))
     zip_code: Mapped[Optional[str]] = mapped_column(String(20))
-    zone: Mapped[Optional[str]] = mapped_column(String(50), index=True)
+    zone: Mapped[Optional[str]] = mapped_column(String(50))
 
     # Geolocation
     latitude: Mapped[Optional[float]] = mapped_column(Float)
@@ -37,28 +48,44 @@ class Property(Base):
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, default=utcnow, nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        DateTime, default=utcnow, onupdate=utcnow, nullable=False
     )
 
-    # Relationships
+    # Relationships. Lazy loading can't work under AsyncSession anyway, so
+    # it raises outright; queries load what they need with selectinload (lists)
+    # or joinedload (single properties)
     pipeline_status: Mapped[Optional["PipelineStatus"]] = relationship(
-        back_populates="property", uselist=False, cascade="all, delete-orphan"
+        back_populates="property", uselist=False, cascade="all, delete-orphan", lazy="raise"
     )
     broker_info: Mapped[Optional["BrokerInfo"]] = relationship(
-        back_populates="property", uselist=False, cascade="all, delete-orphan"
+        back_populates="property", uselist=False, cascade="all, delete-orphan", lazy="raise"
     )
     screener_runs: Mapped[List["ScreenerRun"]] = relationship(
-        back_populates="property", cascade="all, delete-orphan"
+        back_populates="property", cascade="all, delete-orphan", lazy="raise"
     )
     screener_data: Mapped[List["ScreenerData"]] = relationship(
-        back_populates="property", cascade="all, delete-orphan"
+        back_populates="property", cascade="all, delete-orphan", lazy="raise"
     )
 
-    def __repr__(self) -> str:
-        return f"<Property(id={self.id}, name='{self.name}')>"
+
+# Composite indexes matching the (created_at, id) DESC keyset order used by
+# the list endpoints, alone and behind their zone/state filters
+Index("idx_property_created_id", Property.created_at.desc(), Property.id.desc())
+Index(
+    "idx_property_zone_created_id",
+    Property.zone,
+    Property.created_at.desc(),
+    Property.id.desc(),
+)
+Index(
+    "idx_property_state_created_id",
+    Property.state,
+    Property.created_at.desc(),
+    Property.id.desc(),
+)
 
 
 class PipelineStatus(Base):
@@ -69,6 +96,7 @@ class PipelineStatus(Base):
     """
 
     __tablename__ = "pipeline_status"
+    __repr_attrs__ = ("property_id", "phase")
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     property_id: Mapped[int] = mapped_column(
@@ -85,7 +113,7 @@ class PipelineStatus(Base):
     on_off_market: Mapped[Optional[str]] = mapped_column(String(20))  # "On", "Off"
 
     # Key Dates
-    date_added: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    date_added: Mapped[Optional[datetime]] = mapped_column(DateTime, default=utcnow)
     offer_due: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     # Deal Metrics
@@ -111,8 +139,14 @@ class PipelineStatus(Base):
     # Relationship back to property
     property: Mapped["Property"] = relationship(back_populates="pipeline_status")
 
-    def __repr__(self) -> str:
-        return f"<PipelineStatus(property_id={self.property_id}, phase='{self.phase}')>"
+
+# Covers the phase/priority filters on the pipeline listing and stats
+Index(
+    "idx_pipeline_status_phase_priority",
+    PipelineStatus.phase,
+    PipelineStatus.priority,
+    PipelineStatus.property_id,
+)
 
 
 class BrokerInfo(Base):
@@ -121,6 +155,7 @@ class BrokerInfo(Base):
     """
 
     __tablename__ = "broker_info"
+    __repr_attrs__ = ("property_id", "source")
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     property_id: Mapped[int] = mapped_column(
@@ -143,9 +178,6 @@ class BrokerInfo(Base):
     # Relationship back to property
     property: Mapped["Property"] = relationship(back_populates="broker_info")
 
-    def __repr__(self) -> str:
-        return f"<BrokerInfo(property_id={self.property_id}, source='{self.source}')>"
-
 
 class ScreenerRun(Base):
     """
@@ -153,9 +185,10 @@ class ScreenerRun(Base):
     """
 
     __tablename__ = "screener_runs"
+    __repr_attrs__ = ("id", "property_id", "status")
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    property_id: Mapped[int] = mapped_column(ForeignKey("properties.id"), index=True)
+    property_id: Mapped[int] = mapped_column(ForeignKey("properties.id"))
 
     # Run Status
     status: Mapped[str] = mapped_column(
@@ -178,8 +211,22 @@ class ScreenerRun(Base):
     # Relationship back to property
     property: Mapped["Property"] = relationship(back_populates="screener_runs")
 
-    def __repr__(self) -> str:
-        return f"<ScreenerRun(id={self.id}, property_id={self.property_id}, status='{self.status}')>"
+
+# Latest-run lookups read runs for a property newest first
+Index(
+    "idx_screener_run_property_started",
+    ScreenerRun.property_id,
+    ScreenerRun.started_at.desc(),
+)
+# At most one pending or running screener per property; partial, so only
+# active runs are indexed
+Index(
+    "idx_screener_run_active",
+    ScreenerRun.property_id,
+    unique=True,
+    postgresql_where=ScreenerRun.status.in_(("pending", "running")),
+    sqlite_where=ScreenerRun.status.in_(("pending", "running")),
+)
 
 
 class ScreenerData(Base):
@@ -191,9 +238,10 @@ class ScreenerData(Base):
     """
 
     __tablename__ = "screener_data"
+    __repr_attrs__ = ("property_id", "field_name")
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    property_id: Mapped[int] = mapped_column(ForeignKey("properties.id"), index=True)
+    property_id: Mapped[int] = mapped_column(ForeignKey("properties.id"))
 
     # Data Classification
     category: Mapped[str] = mapped_column(
@@ -208,13 +256,20 @@ class ScreenerData(Base):
     validated_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
     # Relationship back to property
     property: Mapped["Property"] = relationship(back_populates="screener_data")
 
-    def __repr__(self) -> str:
-        return f"<ScreenerData(property_id={self.property_id}, field='{self.field_name}')>"
+
+# The data endpoint reads a property's rows, optionally for one category,
+# ordered by category and field name; also serves deletes by property
+Index(
+    "idx_screener_data_property_category_field",
+    ScreenerData.property_id,
+    ScreenerData.category,
+    ScreenerData.field_name,
+)
 
 
 # TODO: Add Email model for email archive feature
@@ -239,6 +294,7 @@ class Zone(Base):
     """
 
     __tablename__ = "zones"
+    __repr_attrs__ = ("name", "states")
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, index=True)  # "Zone 1", "Zone 2", etc.
@@ -246,10 +302,7 @@ class Zone(Base):
     states: Mapped[Optional[str]] = mapped_column(Text)  # Comma-separated: "CO,NM,WY"
     description: Mapped[Optional[str]] = mapped_column(Text)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-
-    def __repr__(self) -> str:
-        return f"<Zone(name='{self.name}', states='{self.states}')>"
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
     def get_states_list(self) -> List[str]:
         """Return states as a list."""
@@ -267,4 +320,4 @@ class Zone(Base):
 #     hashed_password: Mapped[str] = mapped_column(String(255))
 #     role: Mapped[str] = mapped_column(String(20))  # "admin", "analyst", "viewer"
 #     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-#     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+#     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
@@ -0,0 +1,19 @@
+"""
+JSON response class used as the app's default.
+
+FastAPI deprecated its own ORJSONResponse and warns on every response
+built with it, so this is the same orjson-backed response without the
+deprecation.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse that serializes with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
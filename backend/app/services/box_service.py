@@ -5,17 +5,34 @@ Handles reading/writing files from Box cloud storage.
 Supports OAuth2 authentication for personal/free Box accounts.
 """
 
+import asyncio
+import atexit
+import fnmatch
+import hashlib
 import os
 import json
+import re
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 import logging
 
+from fastapi import Request
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 # Lazy import for boxsdk to handle missing package gracefully
 try:
     from boxsdk import OAuth2, Client
     from boxsdk.exception import BoxAPIException
+    from boxsdk.network.default_network import DefaultNetwork
+    from boxsdk.session.session import AuthorizedSession
     BOXSDK_AVAILABLE = True
 except ImportError as e:
     import sys
@@ -24,6 +41,8 @@ except ImportError as e:
     OAuth2 = None
     Client = None
     BoxAPIException = Exception
+    DefaultNetwork = object
+    AuthorizedSession = None
 except Exception as e:
     import sys
     print(f"boxsdk import error (non-ImportError): {e}", file=sys.stderr)
@@ -31,15 +50,45 @@ except Exception as e:
     OAuth2 = None
     Client = None
     BoxAPIException = Exception
+    DefaultNetwork = object
+    AuthorizedSession = None
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of Box API calls in flight at once from concurrent helpers
+BOX_MAX_CONCURRENT_CALLS = 16
+
+# Files downloaded at once from a single folder
+BOX_DOWNLOAD_WORKERS = 8
+
+# Folder listings are reused briefly; folder IDs for a path change rarely
+FOLDER_LISTING_TTL_SECONDS = 60
+FOLDER_ID_TTL_SECONDS = 600
+FOLDER_CACHE_MAX_SIZE = 1024
+
+# Only these fields are requested for folder items; Box returns much larger
+# mini representations (etag, sequence_id, file_version, ...) by default.
+# sha1 (files only) lets downloads skip local copies that are already current
+FOLDER_LISTING_FIELDS = ['id', 'name', 'type', 'sha1']
+
+# Items per page when listing a folder (Box's maximum). Listings use marker
+# pagination, which stays cheap on large folders where offsets get slower
+FOLDER_PAGE_SIZE = 1000
+
+# Bytes read at a time when hashing a local file
+HASH_CHUNK_SIZE = 64 * 1024
+
 # Token storage file path (in a persistent location)
 TOKEN_FILE = os.environ.get('BOX_TOKEN_FILE', '/tmp/box_tokens.json')
 
+# Tokens last read from or written to TOKEN_FILE. boxsdk refreshes tokens on
+# whichever thread hits an expired one, so reads and writes share a lock
+_token_cache: Dict[str, str] = {}
+_token_lock = threading.Lock()
+
 
 def _load_tokens() -> Dict[str, str]:
-    """Load stored OAuth tokens from file or environment."""
+    """Load stored OAuth tokens from the environment, memory or file."""
     # First try environment variables
     access_token = os.environ.get('BOX_ACCESS_TOKEN')
     refresh_token = os.environ.get('BOX_REFRESH_TOKEN')
@@ -50,31 +99,49 @@ def _load_tokens() -> Dict[str, str]:
             'refresh_token': refresh_token
         }
 
-    # Fall back to token file
-    try:
-        if os.path.exists(TOKEN_FILE):
-            with open(TOKEN_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.warning(f"Failed to load tokens from file: {e}")
+    with _token_lock:
+        if _token_cache:
+            return dict(_token_cache)
 
-    return {}
+        # Fall back to token file
+        try:
+            if os.path.exists(TOKEN_FILE):
+                with open(TOKEN_FILE, 'r') as f:
+                    _token_cache.update(json.load(f))
+        except Exception as e:
+            logger.warning(f"Failed to load tokens from file: {e}")
+
+        return dict(_token_cache)
 
 
 def _save_tokens(access_token: str, refresh_token: str):
-    """Save OAuth tokens to file."""
-    try:
-        tokens = {
-            'access_token': access_token,
-            'refresh_token': refresh_token
-        }
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(TOKEN_FILE) or '.', exist_ok=True)
-        with open(TOKEN_FILE, 'w') as f:
-            json.dump(tokens, f)
-        logger.info("Box tokens saved successfully")
-    except Exception as e:
-        logger.error(f"Failed to save tokens: {e}")
+    """
+    Save OAuth tokens to file.
+
+    The file is replaced atomically, so a concurrent reader (or another
+    worker process) never sees a half-written token file. Saving the tokens
+    that are already stored is a no-op.
+    """
+    tokens = {
+        'access_token': access_token,
+        'refresh_token': refresh_token
+    }
+    with _token_lock:
+        if tokens == _token_cache:
+            return
+
+        try:
+            # Ensure directory exists
+            token_dir = os.path.dirname(TOKEN_FILE) or '.'
+            os.makedirs(token_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=token_dir, delete=False) as f:
+                json.dump(tokens, f)
+            os.replace(f.name, TOKEN_FILE)
+            _token_cache.clear()
+            _token_cache.update(tokens)
+            logger.info("Box tokens saved successfully")
+        except Exception as e:
+            logger.error(f"Failed to save tokens: {e}")
 
 
 def _store_tokens_callback(access_token: str, refresh_token: str):
@@ -82,6 +149,97 @@ def _store_tokens_callback(access_token: str, refresh_token: str):
     _save_tokens(access_token, refresh_token)
 
 
+def _make_http_session() -> requests.Session:
+    """
+    Create the keep-alive HTTP session shared by every Box client.
+
+    Only failed connects are retried here (e.g. a pooled socket the server
+    already closed); boxsdk itself retries 429 and 5xx responses.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=BOX_MAX_CONCURRENT_CALLS,
+        pool_maxsize=BOX_MAX_CONCURRENT_CALLS,
+        max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5),
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+# One pool for the process, so re-authenticating keeps the open connections
+_http_session = _make_http_session()
+atexit.register(_http_session.close)
+
+
+def _file_sha1(path: str) -> str:
+    """SHA-1 hex digest of a local file, as Box reports it for file versions."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _PooledNetwork(DefaultNetwork):
+    """
+    Box network layer whose HTTP pool can keep a connection per concurrent call.
+
+    requests keeps 10 connections per host by default, so with more calls in
+    flight the extras were opened and then dropped, paying a new TLS
+    handshake each time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._session = _http_session
+
+
+def _make_client(oauth: "OAuth2") -> "Client":
+    """Create a Box client that shares one keep-alive connection pool."""
+    return Client(oauth, session=AuthorizedSession(oauth, network_layer=_PooledNetwork()))
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self._ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        """Drop a cached value if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        with self._lock:
+            self._data.clear()
+
+
 class BoxService:
     """
     Service for interacting with Box cloud storage.
@@ -93,6 +251,10 @@ class BoxService:
         """Initialize Box client from environment variables or stored tokens."""
         self.client: Optional[Client] = None
         self.oauth: Optional[OAuth2] = None
+        # Resolved folder IDs keyed by (folder_path, parent_folder_id)
+        self._folder_ids = _TTLCache(FOLDER_CACHE_MAX_SIZE, FOLDER_ID_TTL_SECONDS)
+        # Folder listings keyed by folder ID
+        self._listings = _TTLCache(FOLDER_CACHE_MAX_SIZE, FOLDER_LISTING_TTL_SECONDS)
         self._init_client()
 
     def _init_client(self):
@@ -123,18 +285,9 @@ class BoxService:
                     refresh_token=refresh_token,
                     store_tokens=_store_tokens_callback
                 )
-                self.client = Client(self.oauth)
-
-                # Verify connection works
-                try:
-                    user = self.client.user().get()
-                    logger.info(f"Box authenticated as: {user.name} ({user.login})")
-                except BoxAPIException as e:
-                    if e.status == 401:
-                        logger.warning("Box tokens expired, need re-authorization")
-                        self.client = None
-                    else:
-                        raise
+                # The tokens are checked by verify_connection(), so building
+                # the client makes no network calls
+                self.client = _make_client(self.oauth)
             else:
                 logger.info("No Box tokens found - OAuth authorization required")
                 logger.info("Visit /api/auth/box/login to authorize Box access")
@@ -143,6 +296,32 @@ class BoxService:
             logger.error(f"Failed to initialize Box client: {e}")
             self.client = None
 
+    def verify_connection(self) -> bool:
+        """
+        Check the stored tokens with one API call.
+
+        Drops the client if the tokens were revoked or the call fails, as
+        initialization used to. Run off the request path (e.g. in a thread at
+        startup) since it blocks on Box.
+
+        Returns:
+            True if the client is still connected
+        """
+        if not self.client:
+            return False
+
+        try:
+            user = self.client.user().get()
+            logger.info(f"Box authenticated as: {user.name} ({user.login})")
+        except Exception as e:
+            if getattr(e, 'status', None) == 401:
+                logger.warning("Box tokens expired, need re-authorization")
+            else:
+                logger.error(f"Failed to verify Box connection: {e}")
+            self.client = None
+
+        return self.client is not None
+
     def is_connected(self) -> bool:
         """Check if Box client is connected."""
         return self.client is not None
@@ -206,7 +385,7 @@ class BoxService:
 
             # Initialize client
             self.oauth = oauth
-            self.client = Client(oauth)
+            self.client = _make_client(oauth)
 
             # Verify and log
             user = self.client.user().get()
@@ -232,65 +411,177 @@ class BoxService:
         if not self.client:
             return None
 
-        parts = folder_path.strip('/').split('/')
+        parts = [part for part in folder_path.strip('/').split('/') if part]
+
+        # Folder IDs rarely change, so resolved paths (and their prefixes) are
+        # reused for a while; start from the deepest one already known
         current_folder_id = parent_folder_id
+        resolved = 0
+        for depth in range(len(parts), 0, -1):
+            cached_id = self._folder_ids.get(('/'.join(parts[:depth]), parent_folder_id))
+            if cached_id is not None:
+                current_folder_id = cached_id
+                resolved = depth
+                break
+
+        for depth in range(resolved, len(parts)):
+            child_id = self._find_child(current_folder_id, parts[depth], 'folder')
+            if child_id is None:
+                logger.warning(f"Folder not found: {parts[depth]} in path {folder_path}")
+                return None
 
-        for part in parts:
-            if not part:
-                continue
+            current_folder_id = child_id
+            self._folder_ids.set(('/'.join(parts[:depth + 1]), parent_folder_id), current_folder_id)
 
-            found = False
-            folder = self.client.folder(current_folder_id)
-            items = folder.get_items(limit=1000)
+        return current_folder_id
 
-            for item in items:
-                if item.type == 'folder' and item.name == part:
-                    current_folder_id = item.id
-                    found = True
-                    break
+    def find_subfolder(self, parent_folder_id: str, name: str) -> Optional[str]:
+        """
+        Find a direct subfolder by name and return its ID.
 
-            if not found:
-                logger.warning(f"Folder not found: {part} in path {folder_path}")
-                return None
+        Uses the parent's (cached) listing, so several subfolders of one
+        folder are resolved from a single listing call.
+        """
+        cached_id = self._folder_ids.get((name, parent_folder_id))
+        if cached_id is not None:
+            return cached_id
+
+        for item in self.list_folder(parent_folder_id):
+            if item['type'] == 'folder' and item['name'] == name:
+                self._folder_ids.set((name, parent_folder_id), item['id'])
+                return item['id']
+        return None
 
-        return current_folder_id
+    def invalidate_path(self, parent_folder_id: str, name: str) -> None:
+        """Forget a cached child of a folder and the folder's listing after a write."""
+        self._folder_ids.pop((name, parent_folder_id))
+        self._listings.pop(parent_folder_id)
+
+    def _find_child(self, folder_id: str, name: str, item_type: str) -> Optional[str]:
+        """
+        Return the ID of a folder's child with the given name and type.
+
+        A cached listing of the folder is checked first. Otherwise, or if the
+        item isn't in it (the listing may predate the item), the folder is
+        paged through only until the item turns up.
+        """
+        cached = self._listings.get(folder_id)
+        if cached is not None:
+            for item in cached:
+                if item['type'] == item_type and item['name'] == name:
+                    return item['id']
+
+        folder = self.client.folder(folder_id)
+        for item in folder.get_items(limit=FOLDER_PAGE_SIZE, use_marker=True, fields=FOLDER_LISTING_FIELDS):
+            if item.type == item_type and item.name == name:
+                return item.id
+        return None
 
     def list_folder(self, folder_id: str) -> List[Dict[str, Any]]:
-        """List contents of a folder."""
+        """List contents of a folder, reusing a recent listing if cached."""
         if not self.client:
             return []
 
+        cached = self._listings.get(folder_id)
+        if cached is not None:
+            return list(cached)
+
         items = []
         folder = self.client.folder(folder_id)
-        for item in folder.get_items(limit=1000):
+        for item in folder.get_items(limit=FOLDER_PAGE_SIZE, use_marker=True, fields=FOLDER_LISTING_FIELDS):
+            entry = {
+                'id': item.id,
+                'name': item.name,
+                'type': item.type,
+            }
+            if item.type == 'file':
+                entry['sha1'] = getattr(item, 'sha1', None)
+            items.append(entry)
+
+        self._listings.set(folder_id, items)
+        return list(items)
+
+    def clear_cache(self) -> None:
+        """Forget cached folder listings and resolved folder paths."""
+        self._listings.clear()
+        self._folder_ids.clear()
+
+    def search(
+        self,
+        query: str,
+        ancestor_folder_id: str,
+        result_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search item names under a folder with the Box search API.
+
+        Args:
+            query: Box search query, e.g. "screener OR output"
+            ancestor_folder_id: Only return items below this folder
+            result_type: Optional item type to restrict to ('file' or 'folder')
+
+        Returns:
+            List of matching items with id, name, type and parent_id
+        """
+        if not self.client:
+            return []
+
+        results = self.client.search().query(
+            query,
+            limit=200,
+            ancestor_folders=[self.client.folder(ancestor_folder_id)],
+            result_type=result_type,
+            content_types=['name'],
+            fields=['id', 'name', 'type', 'parent'],
+        )
+
+        items = []
+        for item in results:
+            parent = getattr(item, 'parent', None)
             items.append({
                 'id': item.id,
                 'name': item.name,
                 'type': item.type,
+                'parent_id': parent.id if parent else None,
             })
         return items
 
-    def download_file(self, file_id: str, local_path: str) -> bool:
+    def download_file(self, file_id: str, local_path: str, expected_sha1: Optional[str] = None) -> bool:
         """
         Download a file from Box to local path.
 
         Args:
             file_id: Box file ID
             local_path: Local path to save file
+            expected_sha1: Box SHA-1 of the file; if the local file already
+                has it, the download is skipped
 
         Returns:
-            True if successful
+            True if successful (or already up to date)
         """
         if not self.client:
             return False
 
+        if expected_sha1 and os.path.exists(local_path) and _file_sha1(local_path) == expected_sha1:
+            return True
+
+        # Download beside the target and swap it in, so a reader never sees
+        # a partly written file
+        tmp_path = None
         try:
-            with open(local_path, 'wb') as f:
+            with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(local_path) or '.', delete=False) as f:
+                tmp_path = f.name
                 self.client.file(file_id).download_to(f)
+            os.replace(tmp_path, local_path)
+            tmp_path = None
             return True
         except BoxAPIException as e:
             logger.error(f"Failed to download file {file_id}: {e}")
             return False
+        finally:
+            # Whatever stopped the download, don't leave the partial file
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def download_folder_contents(self, folder_id: str, local_dir: str, pattern: str = None) -> List[str]:
         """
@@ -308,21 +599,26 @@ class BoxService:
             return []
 
         os.makedirs(local_dir, exist_ok=True)
-        downloaded = []
 
-        folder = self.client.folder(folder_id)
-        for item in folder.get_items(limit=1000):
-            if item.type == 'file':
-                if pattern:
-                    import fnmatch
-                    if not fnmatch.fnmatch(item.name, pattern):
-                        continue
-
-                local_path = os.path.join(local_dir, item.name)
-                if self.download_file(item.id, local_path):
-                    downloaded.append(local_path)
+        # The SHA-1s decide which local copies are current, so they must not
+        # come from a listing cached before the folder last changed
+        self._listings.pop(folder_id)
+
+        # Compile the glob once rather than matching it per item
+        matcher = re.compile(fnmatch.translate(pattern)) if pattern else None
+        targets = [
+            (item['id'], os.path.join(local_dir, item['name']), item.get('sha1'))
+            for item in self.list_folder(folder_id)
+            if item['type'] == 'file' and (matcher is None or matcher.match(item['name']))
+        ]
+        if not targets:
+            return []
 
-        return downloaded
+        # Downloads are network-bound, so a few threads overlap them; files
+        # already in local_dir with a matching SHA-1 are not fetched again
+        with ThreadPoolExecutor(max_workers=min(BOX_DOWNLOAD_WORKERS, len(targets))) as executor:
+            results = executor.map(lambda target: self.download_file(*target), targets)
+            return [local_path for (_, local_path, _), ok in zip(targets, results) if ok]
 
     def upload_file(self, local_path: str, folder_id: str, file_name: str = None) -> Optional[str]:
         """
@@ -343,46 +639,69 @@ class BoxService:
             if file_name is None:
                 file_name = os.path.basename(local_path)
 
-            folder = self.client.folder(folder_id)
-
-            # Check if file already exists
-            for item in folder.get_items(limit=1000):
-                if item.type == 'file' and item.name == file_name:
-                    # Update existing file
+            # A recent listing may already show the file, in which case its
+            # contents are updated directly. Otherwise upload as a new file;
+            # the preflight check rejects a taken name before any content is
+            # sent, so the folder is never listed
+            existing_id = self._cached_file_id(folder_id, file_name)
+            file_id = None
+            if existing_id is None:
+                try:
                     with open(local_path, 'rb') as f:
-                        updated_file = item.update_contents_with_stream(f)
-                    return updated_file.id
+                        file_id = self.client.folder(folder_id).upload_stream(
+                            f,
+                            file_name,
+                            preflight_check=True,
+                            preflight_expected_size=os.path.getsize(local_path),
+                        ).id
+                except BoxAPIException as e:
+                    # The file already exists; Box names it in the conflict
+                    conflict = (e.context_info or {}).get('conflicts') if e.status == 409 else None
+                    if not conflict or conflict.get('type') != 'file':
+                        raise
+                    existing_id = conflict['id']
 
-            # Upload new file
-            with open(local_path, 'rb') as f:
-                uploaded_file = folder.upload_stream(f, file_name)
-            return uploaded_file.id
+            if file_id is None:
+                with open(local_path, 'rb') as f:
+                    file_id = self.client.file(existing_id).update_contents_with_stream(f).id
+
+            # The folder's cached listing no longer matches (new file or sha1)
+            self.invalidate_path(folder_id, file_name)
+            return file_id
 
         except BoxAPIException as e:
             logger.error(f"Failed to upload file to Box: {e}")
+            self.invalidate_path(folder_id, file_name)
             return None
 
+    def _cached_file_id(self, folder_id: str, file_name: str) -> Optional[str]:
+        """Return a file's ID from the folder's cached listing, without calling Box."""
+        for item in self._listings.get(folder_id) or []:
+            if item['type'] == 'file' and item['name'] == file_name:
+                return item['id']
+        return None
+
     def read_json_file(self, file_id: str) -> Optional[Dict]:
         """Read and parse a JSON file from Box."""
         if not self.client:
             return None
 
         try:
+            # orjson parses the downloaded bytes directly, with no decode to str
             content = self.client.file(file_id).content()
-            return json.loads(content)
+            return orjson.loads(content)
         except Exception as e:
             logger.error(f"Failed to read JSON file {file_id}: {e}")
             return None
 
     def find_file(self, folder_id: str, file_name: str) -> Optional[str]:
-        """Find a file by name in a folder, return its ID."""
+        """Find a file by name in a folder (using its cached listing), return its ID."""
         if not self.client:
             return None
 
-        folder = self.client.folder(folder_id)
-        for item in folder.get_items(limit=1000):
-            if item.type == 'file' and item.name == file_name:
-                return item.id
+        for item in self.list_folder(folder_id):
+            if item['type'] == 'file' and item['name'] == file_name:
+                return item['id']
         return None
 
     def get_file_content(self, file_id: str) -> Optional[bytes]:
@@ -396,20 +715,62 @@ class BoxService:
             return None
 
 
-# Singleton instance
+async def list_folders_concurrently(
+    box_service: "BoxService",
+    folder_ids: List[str],
+) -> List[List[Dict[str, Any]]]:
+    """
+    List several Box folders at once from async code.
+
+    Each (blocking) list_folder call runs in a worker thread, with at most
+    BOX_MAX_CONCURRENT_CALLS in flight to stay under Box rate limits.
+    Results are returned in the same order as folder_ids.
+    """
+    semaphore = asyncio.Semaphore(BOX_MAX_CONCURRENT_CALLS)
+
+    async def list_folder(folder_id: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await asyncio.to_thread(box_service.list_folder, folder_id)
+
+    return await asyncio.gather(*(list_folder(folder_id) for folder_id in folder_ids))
+
+
+# Singleton instance, shared by request handlers and worker threads
 _box_service: Optional[BoxService] = None
+_box_service_lock = threading.Lock()
 
 
 def get_box_service() -> BoxService:
-    """Get or create Box service instance."""
+    """
+    Get or create Box service instance.
+
+    Callers on different threads (e.g. asyncio.to_thread) could otherwise
+    race to create it, each building its own client and connection pool.
+    """
     global _box_service
     if _box_service is None:
-        _box_service = BoxService()
+        with _box_service_lock:
+            if _box_service is None:
+                _box_service = BoxService()
     return _box_service
 
 
+def get_app_box_service(request: Request) -> BoxService:
+    """
+    FastAPI dependency returning the Box service shared through app.state.
+
+    The service is stored on app.state at startup; it is set here on first
+    use for apps whose lifespan doesn't do that.
+    """
+    box_service = getattr(request.app.state, "box_service", None)
+    if box_service is None:
+        box_service = request.app.state.box_service = get_box_service()
+    return box_service
+
+
 def reinitialize_box_service() -> BoxService:
     """Force re-initialization of Box service (after OAuth)."""
     global _box_service
-    _box_service = BoxService()
+    with _box_service_lock:
+        _box_service = BoxService()
     return _box_service
@@ -13,13 +13,14 @@ import os
 import json
 import tempfile
 import shutil
+import time
 from typing import Callable, Optional, Dict, Any
 from dataclasses import dataclass
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
-from app.services.box_service import get_box_service
+from app.services.box_service import BoxAPIException, BoxService, get_box_service
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,31 @@ SCREENER_AGENT_PATH = Path(__file__).parent.parent.parent / "screener_agent"
 if str(SCREENER_AGENT_PATH) not in sys.path:
     sys.path.insert(0, str(SCREENER_AGENT_PATH))
 
+# Box files downloaded for screener runs, kept across runs by property folder;
+# a property's files are dropped once it hasn't been run for a week
+SCREENER_DOWNLOAD_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'rmp_screener_downloads')
+SCREENER_DOWNLOAD_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+# Screener runs at once; shared by every ScreenerService so re-creating the
+# service never leaves an extra pool of idle threads behind
+SCREENER_MAX_WORKERS = 2
+_screener_executor = ThreadPoolExecutor(
+    max_workers=SCREENER_MAX_WORKERS,
+    thread_name_prefix="screener",
+)
+
+
+def _prune_download_cache() -> None:
+    """Remove cached downloads of properties not run within the max age."""
+    if not os.path.isdir(SCREENER_DOWNLOAD_CACHE_DIR):
+        return
+
+    cutoff = time.time() - SCREENER_DOWNLOAD_CACHE_MAX_AGE_SECONDS
+    with os.scandir(SCREENER_DOWNLOAD_CACHE_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
 
 @dataclass
 class ScreenerProgress:
@@ -60,9 +86,19 @@ class ScreenerService:
 
     def __init__(self):
         """Initialize the screener service."""
-        self._executor = ThreadPoolExecutor(max_workers=2)
-        self._box = get_box_service()
         self._properties_folder_id: Optional[str] = None
+        # Property folders found so far, keyed by lowercased config property_name
+        self._property_index: Dict[str, Dict] = {}
+
+    @property
+    def _box(self) -> BoxService:
+        """
+        The current Box service.
+
+        Looked up on every use rather than kept, since re-authenticating
+        with Box replaces the service and this one lives for the process.
+        """
+        return get_box_service()
 
     def _get_properties_folder_id(self) -> Optional[str]:
         """Get the Box folder ID for Properties folder."""
@@ -87,113 +123,170 @@ class ScreenerService:
             logger.error("Properties folder not found in Box")
             return None
 
-        # Search through zone folders
-        zone_folders = self._box.list_folder(props_folder_id)
-        for zone in zone_folders:
-            if zone['type'] != 'folder' or zone['name'].startswith('_'):
+        key = property_name.lower()
+
+        # A folder found before only needs its config re-read, which also
+        # confirms it still belongs to this property
+        indexed = self._property_index.get(key)
+        if indexed:
+            config = self._box.read_json_file(indexed['config_file_id'])
+            if config and config.get('property_name', '').lower() == key:
+                return {**indexed, 'config': config}
+            self._property_index.pop(key, None)
+
+        zone_folders = [
+            zone for zone in self._box.list_folder(props_folder_id)
+            if zone['type'] == 'folder' and not zone['name'].startswith('_')
+        ]
+
+        # Box search can usually find the folder by name in one call; each
+        # candidate directly inside a zone is confirmed against its config
+        zone_names = {zone['id']: zone['name'] for zone in zone_folders}
+        try:
+            candidates = self._box.search(property_name, props_folder_id, result_type='folder')
+        except BoxAPIException as e:
+            logger.warning(f"Box search failed for {property_name}, walking zones instead: {e}")
+            candidates = []
+        for candidate in candidates:
+            zone_name = zone_names.get(candidate['parent_id'])
+            if zone_name is None:
                 continue
+            info = self._load_property_info(candidate, zone_name)
+            if info and info['config'].get('property_name', '').lower() == key:
+                return info
 
-            # Search property folders in this zone
+        # Fall back to walking every zone (folder names need not match the
+        # property name); every config read along the way is indexed
+        for zone in zone_folders:
             property_folders = self._box.list_folder(zone['id'])
             for prop in property_folders:
                 if prop['type'] != 'folder':
                     continue
 
-                # Check if this folder has a config.json
-                config_file_id = self._box.find_file(prop['id'], 'config.json')
-                if config_file_id:
-                    config = self._box.read_json_file(config_file_id)
-                    if config and config.get('property_name', '').lower() == property_name.lower():
-                        return {
-                            'folder_id': prop['id'],
-                            'folder_name': prop['name'],
-                            'zone': zone['name'],
-                            'config_file_id': config_file_id,
-                            'config': config,
-                        }
+                info = self._load_property_info(prop, zone['name'])
+                if info and info['config'].get('property_name', '').lower() == key:
+                    return info
 
         return None
 
-    def _run_screener_sync(self, property_info: Dict, temp_dir: str) -> Dict[str, Any]:
+    def _load_property_info(self, prop: Dict, zone_name: str) -> Optional[Dict]:
         """
-        Run the screener synchronously.
+        Read a property folder's config.json and index the folder by its name.
 
-        Downloads files from Box, runs screener, uploads results.
+        Returns dict with folder_id, zone and config, or None if the folder
+        has no readable config.
         """
-        try:
-            property_name = property_info['config']['property_name']
-            folder_id = property_info['folder_id']
-
-            # Create local folder structure
-            local_prop_dir = os.path.join(temp_dir, property_info['folder_name'])
-            os.makedirs(local_prop_dir, exist_ok=True)
-
-            costar_dir = os.path.join(local_prop_dir, 'CoStar Reports')
-            os.makedirs(costar_dir, exist_ok=True)
-
-            maps_dir = os.path.join(local_prop_dir, 'Maps')
-            os.makedirs(maps_dir, exist_ok=True)
-
-            # Download config.json
-            config_path = os.path.join(local_prop_dir, 'config.json')
-            self._box.download_file(property_info['config_file_id'], config_path)
-
-            # Update config with local paths
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
-            config['paths'] = {
-                'costar_reports_dir': costar_dir,
-                'output_path': local_prop_dir,
-                'screener_file': os.path.join(local_prop_dir, f"RMP Screener_{property_name}.xlsx"),
-                'output_file': os.path.join(local_prop_dir, f"RMP Screener_{property_name}.xlsx"),
-            }
-
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-
-            # Find and download CoStar PDFs from Box
-            costar_folder_id = self._box.find_folder("CoStar Reports", folder_id)
-            if costar_folder_id:
-                self._box.download_folder_contents(costar_folder_id, costar_dir, '*.pdf')
-                self._box.download_folder_contents(costar_folder_id, costar_dir)
-
-            logger.info(f"Downloaded files to {local_prop_dir}")
-
-            # Run the screener agent
-            from agent_v2 import ScreenerAgent
-            agent = ScreenerAgent(config_path)
-            agent.run()
-
-            # Upload results back to Box
-            output_file = config['paths']['output_file']
-            if os.path.exists(output_file):
-                self._box.upload_file(output_file, folder_id)
-
-            # Upload maps
-            if os.path.exists(maps_dir):
-                maps_folder_id = self._box.find_folder('Maps', folder_id)
-                if maps_folder_id:
-                    for map_file in os.listdir(maps_dir):
-                        map_path = os.path.join(maps_dir, map_file)
-                        if os.path.isfile(map_path):
-                            self._box.upload_file(map_path, maps_folder_id)
-
-            return {
-                "success": True,
-                "output_file": output_file,
-                "maps": list(agent.map_screenshots.keys()) if hasattr(agent, 'map_screenshots') else [],
-                "extracted_data": agent.extracted_data if hasattr(agent, 'extracted_data') else {},
-            }
+        config_file_id = self._box.find_file(prop['id'], 'config.json')
+        if not config_file_id:
+            return None
 
-        except Exception as e:
-            import traceback
-            tb = traceback.format_exc()
-            logger.exception(f"Screener failed: {e}")
-            return {
-                "success": False,
-                "error": f"{str(e)}\n\nTraceback:\n{tb}",
-            }
+        config = self._box.read_json_file(config_file_id)
+        if not config:
+            return None
+
+        info = {
+            'folder_id': prop['id'],
+            'folder_name': prop['name'],
+            'zone': zone_name,
+            'config_file_id': config_file_id,
+            'config': config,
+        }
+        if config.get('property_name'):
+            self._property_index[config['property_name'].lower()] = info
+        return info
+
+    def _prepare_workspace(self, property_info: Dict, temp_dir: str) -> Dict[str, str]:
+        """
+        Create the local folder layout for a run and write its config.json.
+
+        Returns the local paths the agent is configured with, plus
+        config_path and maps_dir.
+        """
+        property_name = property_info['config']['property_name']
+
+        # Create local folder structure
+        local_prop_dir = os.path.join(temp_dir, property_info['folder_name'])
+        os.makedirs(local_prop_dir, exist_ok=True)
+
+        costar_dir = os.path.join(local_prop_dir, 'CoStar Reports')
+        os.makedirs(costar_dir, exist_ok=True)
+
+        maps_dir = os.path.join(local_prop_dir, 'Maps')
+        os.makedirs(maps_dir, exist_ok=True)
+
+        # config.json was just read from Box to find the folder, so write
+        # that copy (with local paths) instead of downloading it again
+        config_path = os.path.join(local_prop_dir, 'config.json')
+        config = dict(property_info['config'])
+        config['paths'] = {
+            'costar_reports_dir': costar_dir,
+            'output_path': local_prop_dir,
+            'screener_file': os.path.join(local_prop_dir, f"RMP Screener_{property_name}.xlsx"),
+            'output_file': os.path.join(local_prop_dir, f"RMP Screener_{property_name}.xlsx"),
+        }
+
+        # Only the agent reads this temp copy, so it is written compactly
+        with open(config_path, 'w') as f:
+            json.dump(config, f, separators=(',', ':'))
+
+        return {**config['paths'], 'config_path': config_path, 'maps_dir': maps_dir}
+
+    def _download_costar_reports(self, folder_id: str, costar_dir: str) -> None:
+        """Download a property's CoStar reports (PDFs and any exports) from Box."""
+        costar_folder_id = self._box.find_subfolder(folder_id, "CoStar Reports")
+        if not costar_folder_id:
+            return
+
+        _prune_download_cache()
+
+        # Reports are kept between runs and only re-fetched when their
+        # SHA-1 changes in Box; the run works on its own copies
+        property_cache_dir = os.path.join(SCREENER_DOWNLOAD_CACHE_DIR, folder_id)
+        cache_dir = os.path.join(property_cache_dir, 'CoStar Reports')
+        downloaded = self._box.download_folder_contents(costar_folder_id, cache_dir)
+        os.utime(property_cache_dir)
+
+        # Drop cached reports that are no longer in Box
+        keep = set(downloaded)
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.path not in keep:
+                    os.remove(entry.path)
+
+        for cached_path in downloaded:
+            shutil.copy2(cached_path, costar_dir)
+
+    def _run_agent_sync(self, config_path: str) -> Dict[str, Any]:
+        """Run the screener agent on a prepared workspace."""
+        from agent_v2 import ScreenerAgent
+        agent = ScreenerAgent(config_path)
+        agent.run()
+
+        return {
+            "maps": list(agent.map_screenshots.keys()) if hasattr(agent, 'map_screenshots') else [],
+            "extracted_data": agent.extracted_data if hasattr(agent, 'extracted_data') else {},
+        }
+
+    async def _upload_results(self, folder_id: str, paths: Dict[str, str]) -> None:
+        """Upload the screener workbook and any maps back to Box."""
+        uploads = []
+
+        output_file = paths['output_file']
+        if os.path.exists(output_file):
+            uploads.append(asyncio.to_thread(self._box.upload_file, output_file, folder_id))
+
+        # scandir entries already know whether they are files, with no stat
+        with os.scandir(paths['maps_dir']) as entries:
+            map_files = [entry for entry in entries if entry.is_file()]
+        if map_files:
+            maps_folder_id = await asyncio.to_thread(self._box.find_subfolder, folder_id, 'Maps')
+            if maps_folder_id:
+                uploads.extend(
+                    asyncio.to_thread(self._box.upload_file, entry.path, maps_folder_id, entry.name)
+                    for entry in map_files
+                )
+
+        await asyncio.gather(*uploads)
 
     async def run_analysis(
         self,
@@ -232,7 +325,7 @@ class ScreenerService:
                     message=f"Searching for {property_name} in Box...",
                 ))
 
-            property_info = self._find_property_folder(property_name)
+            property_info = await asyncio.to_thread(self._find_property_folder, property_name)
             if not property_info:
                 return ScreenerResult(
                     success=False,
@@ -251,44 +344,48 @@ class ScreenerService:
 
             # Create temp directory for processing
             temp_dir = tempfile.mkdtemp(prefix='screener_')
+            paths = await asyncio.to_thread(self._prepare_workspace, property_info, temp_dir)
+
+            # Box downloads and uploads are I/O, so they run in short-lived
+            # worker threads; only the agent itself occupies the screener pool
+            await asyncio.to_thread(
+                self._download_costar_reports,
+                property_info['folder_id'],
+                paths['costar_reports_dir'],
+            )
+            logger.info(f"Downloaded files to {paths['output_path']}")
 
-            # Run the screener in a thread pool
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             result = await loop.run_in_executor(
-                self._executor,
-                self._run_screener_sync,
-                property_info,
-                temp_dir,
+                _screener_executor,
+                self._run_agent_sync,
+                paths['config_path'],
             )
 
-            if result.get("success"):
-                if progress_callback:
-                    progress_callback(ScreenerProgress(
-                        step="Complete",
-                        status="complete",
-                        percent=100,
-                        message="Analysis complete. Results uploaded to Box.",
-                    ))
+            if progress_callback:
+                progress_callback(ScreenerProgress(
+                    step="Uploading Results",
+                    status="running",
+                    percent=90,
+                    message="Uploading results to Box...",
+                ))
 
-                return ScreenerResult(
-                    success=True,
-                    output_excel_path=result.get("output_file"),
-                    maps_generated=result.get("maps", []),
-                    extracted_data=result.get("extracted_data", {}),
-                )
-            else:
-                if progress_callback:
-                    progress_callback(ScreenerProgress(
-                        step="Error",
-                        status="error",
-                        percent=0,
-                        message=result.get("error", "Unknown error"),
-                    ))
+            await self._upload_results(property_info['folder_id'], paths)
 
-                return ScreenerResult(
-                    success=False,
-                    error_message=result.get("error", "Unknown error"),
-                )
+            if progress_callback:
+                progress_callback(ScreenerProgress(
+                    step="Complete",
+                    status="complete",
+                    percent=100,
+                    message="Analysis complete. Results uploaded to Box.",
+                ))
+
+            return ScreenerResult(
+                success=True,
+                output_excel_path=paths['output_file'],
+                maps_generated=result["maps"],
+                extracted_data=result["extracted_data"],
+            )
 
         except Exception as e:
             import traceback
@@ -336,16 +433,14 @@ class ScreenerService:
                 if prop['type'] != 'folder':
                     continue
 
-                config_file_id = self._box.find_file(prop['id'], 'config.json')
-                if config_file_id:
-                    config = self._box.read_json_file(config_file_id)
-                    if config:
-                        properties.append({
-                            "id": prop['id'],
-                            "name": config.get('property_name', prop['name']),
-                            "zone": zone['name'],
-                            "status": "active",
-                        })
+                info = self._load_property_info(prop, zone['name'])
+                if info:
+                    properties.append({
+                        "id": prop['id'],
+                        "name": info['config'].get('property_name', prop['name']),
+                        "zone": zone['name'],
+                        "status": "active",
+                    })
 
         return properties
 
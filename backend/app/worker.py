@@ -0,0 +1,86 @@
+"""
+Background job worker for screener runs.
+
+Screener runs take minutes, so with SCREENER_WORKER enabled they are queued
+in Redis and run by a separate arq worker process instead of in the API's
+event loop. Start it next to uvicorn, pointed at the same database:
+
+    cd backend && arq app.worker.WorkerSettings
+
+Without it, start_screener falls back to FastAPI BackgroundTasks.
+"""
+
+from typing import Optional
+import logging
+import time
+
+from app.config import settings
+
+# Lazy import for arq to handle missing package gracefully
+try:
+    from arq import create_pool
+    from arq.connections import ArqRedis, RedisSettings
+    ARQ_AVAILABLE = True
+except ImportError:
+    create_pool = None
+    ArqRedis = None
+    RedisSettings = None
+    ARQ_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Screener runs are heavy; keep a worker to a couple at a time
+WORKER_MAX_JOBS = 2
+SCREENER_JOB_TIMEOUT_SECONDS = 30 * 60
+
+# The API connects once, without retries, so a request never waits long on
+# an unreachable Redis; after a failure it runs screeners in-process for a
+# while before trying again
+JOB_POOL_CONNECT_TIMEOUT_SECONDS = 1
+JOB_POOL_RETRY_SECONDS = 30
+
+# Singleton pool for enqueueing jobs
+_pool = None
+_pool_retry_at = 0.0
+
+
+async def get_job_pool() -> Optional["ArqRedis"]:
+    """Get the shared arq pool, or None if screeners run in-process."""
+    global _pool, _pool_retry_at
+    if _pool is None and settings.screener_worker:
+        if not ARQ_AVAILABLE:
+            logger.warning("SCREENER_WORKER is set but the arq package is not installed")
+            return None
+        if not settings.redis_url:
+            logger.warning("SCREENER_WORKER is set but REDIS_URL is not")
+            return None
+        if time.monotonic() < _pool_retry_at:
+            return None
+
+        redis_settings = RedisSettings.from_dsn(settings.redis_url)
+        redis_settings.conn_retries = 0
+        redis_settings.conn_timeout = JOB_POOL_CONNECT_TIMEOUT_SECONDS
+        try:
+            _pool = await create_pool(redis_settings)
+        except Exception as e:
+            _pool_retry_at = time.monotonic() + JOB_POOL_RETRY_SECONDS
+            logger.warning(f"Could not connect to Redis for screener jobs, running them in-process: {e}")
+            return None
+    return _pool
+
+
+async def run_screener(ctx, run_id: int, property_id: int, property_name: str) -> None:
+    """arq job: run a queued screener and record its progress and result."""
+    # Imported here since the screener API imports this module
+    from app.api.screener import run_screener_task
+
+    await run_screener_task(run_id=run_id, property_id=property_id, property_name=property_name)
+
+
+class WorkerSettings:
+    """Settings for `arq app.worker.WorkerSettings`."""
+
+    functions = [run_screener]
+    redis_settings = RedisSettings.from_dsn(settings.redis_url) if ARQ_AVAILABLE and settings.redis_url else None
+    max_jobs = WORKER_MAX_JOBS
+    job_timeout = SCREENER_JOB_TIMEOUT_SECONDS
@@ -2,6 +2,8 @@
 """Diagnostic script to identify import/startup issues."""
 
 import sys
+import time
+
 print(f"Python version: {sys.version}")
 print(f"Python path: {sys.path}")
 print()
@@ -26,13 +28,24 @@ imports = [
     ("app.main", "from app.main import app"),
 ]
 
+# Imports run in order and one at a time: the app modules import each other,
+# and each time shows what that import added on top of the ones before it
+total = 0.0
 for name, import_stmt in imports:
+    start = time.perf_counter()
     try:
-        exec(import_stmt)
-        print(f"OK: {name}")
+        exec(compile(import_stmt, "<diagnose>", "exec"), {})
+        status = "OK"
+        detail = ""
     except Exception as e:
-        print(f"FAIL: {name} - {type(e).__name__}: {e}")
+        status = "FAIL"
+        detail = f" - {type(e).__name__}: {e}"
         # Don't break - continue to find all issues
+    elapsed = time.perf_counter() - start
+    total += elapsed
+    print(f"{status}: {name} ({elapsed * 1000:.0f} ms){detail}")
+
+print(f"Total import time: {total * 1000:.0f} ms")
 
 print()
 print("Diagnosis complete.")
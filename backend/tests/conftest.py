@@ -0,0 +1,55 @@
+"""
+Shared fixtures for API tests.
+
+The app runs against a throwaway SQLite file (set before any app module
+is imported, since the engine is created at import) with Box, Redis and
+the screener worker left unconfigured.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="rmp_tests_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("SCREENER_WORKER", None)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.cache import clear_property_cache
+from app.database import engine
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client with the app's startup (table creation) already run."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_property_cache():
+    """Start every test with no cached property responses."""
+    clear_property_cache()
+    yield
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Record the SQL statements executed while the test runs.
+
+    Yields the list of statements; clear it before the request being
+    measured.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
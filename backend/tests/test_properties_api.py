@@ -0,0 +1,167 @@
+"""
+Property and pipeline endpoints against a real database.
+
+Property relationships are lazy="raise", so any response that touches a
+relationship it didn't eager-load fails with a 500; these requests cover
+every path that builds a response from Property and its relations. The
+statement counts check that those responses take a fixed number of
+queries however many properties there are.
+"""
+
+import pytest
+
+from app.cache import clear_property_cache
+
+
+@pytest.fixture
+def property_id(client):
+    """A property created with pipeline status and broker info."""
+    response = client.post("/api/properties/", json={
+        "name": "Varsity Townhomes",
+        "zone": "Zone1",
+        "pipeline_status": {"phase": "LOI", "priority": "High"},
+        "broker_info": {"source": "CoStar", "broker_name": "Bob"},
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_create_returns_relations(client):
+    response = client.post("/api/properties/", json={
+        "name": "Elm Court",
+        "pipeline_status": {"phase": "LOI"},
+        "broker_info": {"broker_name": "Al"},
+    })
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["pipeline_status"]["phase"] == "LOI"
+    assert body["broker_info"]["broker_name"] == "Al"
+
+
+def test_create_without_relations(client):
+    response = client.post("/api/properties/", json={"name": "Bare"})
+
+    assert response.status_code == 201
+    assert response.json()["broker_info"] is None
+
+
+def test_batch_create_returns_relations_in_order(client):
+    response = client.post("/api/properties/batch", json=[
+        {"name": "B1"},
+        {"name": "B2", "pipeline_status": {"priority": "High"}, "broker_info": {"broker_name": "Bob"}},
+        {"name": "B3"},
+    ])
+
+    assert response.status_code == 201
+    body = response.json()
+    assert [item["name"] for item in body] == ["B1", "B2", "B3"]
+    assert body[1]["pipeline_status"]["priority"] == "High"
+    assert body[1]["broker_info"]["broker_name"] == "Bob"
+    assert body[0]["broker_info"] is None
+
+
+def test_detail(client, property_id):
+    response = client.get(f"/api/properties/{property_id}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pipeline_status"]["priority"] == "High"
+    assert body["broker_info"]["source"] == "CoStar"
+
+
+def test_detail_not_found(client):
+    assert client.get("/api/properties/999999").status_code == 404
+
+
+def test_update(client, property_id):
+    response = client.put(f"/api/properties/{property_id}", json={"city": "Denver"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["city"] == "Denver"
+    assert body["broker_info"]["broker_name"] == "Bob"
+
+
+def test_database_listings(client, property_id):
+    properties = client.get("/api/properties/db")
+    pipeline = client.get("/api/pipeline/db")
+
+    assert properties.status_code == 200
+    assert pipeline.status_code == 200
+    assert property_id in [item["id"] for item in properties.json()]
+    assert property_id in [item["id"] for item in pipeline.json()]
+
+
+def test_status_upsert(client, property_id):
+    response = client.put(f"/api/pipeline/{property_id}/status", json={"notes": "Call back"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["notes"] == "Call back"
+    assert body["broker_name"] == "Bob"
+
+
+def test_upserts_create_missing_rows(client):
+    bare_id = client.post("/api/properties/", json={"name": "No Broker"}).json()["id"]
+
+    broker = client.put(f"/api/pipeline/{bare_id}/broker", json={"broker_name": "Cy"})
+    status = client.put(f"/api/pipeline/{bare_id}/status", json={"priority": "Low"})
+
+    assert broker.status_code == 200
+    assert status.status_code == 200
+    assert status.json()["broker_name"] == "Cy"
+    assert client.get(f"/api/properties/{bare_id}").json()["broker_info"]["broker_name"] == "Cy"
+
+
+def _statements_for(count_queries, request):
+    """Number of SQL statements one request runs, with the response cache cleared first."""
+    clear_property_cache()
+    count_queries.clear()
+    response = request()
+    assert response.status_code < 400
+    return len(count_queries)
+
+
+def _add_properties(client, count):
+    for index in range(count):
+        client.post("/api/properties/", json={
+            "name": f"Extra {index}",
+            "pipeline_status": {"phase": "LOI"},
+            "broker_info": {"broker_name": "Dee"},
+        })
+
+
+@pytest.mark.parametrize("path, expected", [
+    # Properties, then one selectin load each for status and broker
+    ("/api/properties/db", 3),
+    # Properties joined to status and broker
+    ("/api/pipeline/db", 1),
+])
+def test_listing_statement_count_does_not_grow(client, count_queries, property_id, path, expected):
+    before = _statements_for(count_queries, lambda: client.get(path))
+    _add_properties(client, 5)
+    after = _statements_for(count_queries, lambda: client.get(path))
+
+    assert before == after == expected
+
+
+def test_detail_is_one_statement(client, count_queries, property_id):
+    assert _statements_for(
+        count_queries, lambda: client.get(f"/api/properties/{property_id}")
+    ) == 1
+
+
+def test_update_statement_count(client, count_queries, property_id):
+    # Load with relations, then the UPDATE
+    assert _statements_for(
+        count_queries, lambda: client.put(f"/api/properties/{property_id}", json={"city": "Boulder"})
+    ) == 2
+
+
+def test_status_upsert_statement_count(client, count_queries, property_id):
+    # The upsert, then the reload with relations
+    assert _statements_for(
+        count_queries,
+        lambda: client.put(f"/api/pipeline/{property_id}/status", json={"notes": "n"}),
+    ) == 2